@@ -3,24 +3,29 @@ from gym.envs import registration
 
 logger = logging.getLogger(__name__)
 
-all_envs = registration.registry.all()
-env_ids = [env_spec.id for env_spec in all_envs]
-for env in registration.registry.env_specs.copy():
-    if 'Minesweeper-v0' in env:
-        print("Remove {} from registry".format(env))
-        del registration.registry.env_specs[env]
-    if 'MinesweeperHard-v0' in env:
-        print("Remove {} from registry".format(env))
-        del registration.registry.env_specs[env]
+# The board sizes and mine counts of the classic difficulties.
+DIFFICULTIES = {
+    "beginner": {"width": 9, "height": 9, "mine_count": 10},
+    "intermediate": {"width": 16, "height": 16, "mine_count": 40},
+    "expert": {"width": 30, "height": 16, "mine_count": 99},
+}
 
-registration.register(
-    id='Minesweeper-v0',
-    entry_point='gym_minesweeper.envs:MinesweeperEnv',
-    nondeterministic=False,
-)
 
-registration.register(
-    id='MinesweeperHard-v0',
-    entry_point='gym.envs:MinesweeperHardEnv',
-    nondeterministic=False,
-)
+def _register(id, entry_point, **kwargs):
+    # Importing this package again, for example after a reload or in a
+    # notebook, keeps the envs that are already registered.
+    if id in registration.registry.env_specs:
+        return
+    registration.register(id=id, entry_point=entry_point,
+                          nondeterministic=False, **kwargs)
+
+
+_register('Minesweeper-v0', 'gym_minesweeper.envs:MinesweeperEnv')
+_register('MinesweeperVector-v0', 'gym_minesweeper.envs:VectorMinesweeperEnv')
+_register('MinesweeperLarge-v0', 'gym_minesweeper.envs:LargeMinesweeperEnv')
+
+for _name, _board in DIFFICULTIES.items():
+    _register('Minesweeper{}-v0'.format(_name.capitalize()),
+              'gym_minesweeper.envs:MinesweeperEnv', kwargs=_board)
+_register('MinesweeperHard-v0', 'gym_minesweeper.envs:MinesweeperEnv',
+          kwargs=DIFFICULTIES["expert"])
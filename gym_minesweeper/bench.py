@@ -0,0 +1,158 @@
+"""
+Throughput benchmarks for the minesweeper environments.
+
+Run with
+
+    python -m gym_minesweeper.bench --output bench.json
+
+to measure steps, resets, flood fills and rendering on boards of several
+sizes, and print the results as JSON.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+
+import gym
+import numpy as np
+
+from gym_minesweeper import DIFFICULTIES
+from gym_minesweeper.envs import MinesweeperEnv, VectorMinesweeperEnv
+
+PRESETS = dict(
+    DIFFICULTIES,
+    large={"width": 100, "height": 100, "mine_count": 2000},
+    huge={"width": 500, "height": 500, "mine_count": 50000},
+)
+
+
+def bench_steps(board, steps, seed=0):
+    """
+    Play random actions and return the amount of steps per second, including
+    the resets of finished games.
+    """
+    env = MinesweeperEnv(seed=seed, **board)
+    actions = np.random.default_rng(seed).integers(env.action_space.n,
+                                                    size=steps)
+    start = time.perf_counter()
+    for action in actions:
+        done = env.step(action)[2]
+        if done:
+            env.reset()
+    return steps / (time.perf_counter() - start)
+
+
+def bench_resets(board, resets, seed=0):
+    """
+    Return the amount of resets per second, each followed by the first step,
+    which is when the mines are placed.
+    """
+    env = MinesweeperEnv(seed=seed, **board)
+    start = time.perf_counter()
+    for _ in range(resets):
+        env.reset()
+        env.step(0)
+    return resets / (time.perf_counter() - start)
+
+
+def bench_flood_fill(board, repeats, seed=0):
+    """
+    Return the worst time in seconds of a step that opens the whole board,
+    on a board with a single mine.
+    """
+    env = MinesweeperEnv(seed=seed, first_move_safe=False, **board)
+    worst = 0
+    for _ in range(repeats):
+        env.reset()
+        mines = np.zeros((env.width, env.height), dtype=bool)
+        mines[-1, -1] = True
+        env.mines = mines
+        start = time.perf_counter()
+        env.step(0)
+        worst = max(worst, time.perf_counter() - start)
+    return worst
+
+
+def bench_render(board, repeats, seed=0):
+    """
+    Return the average time in seconds of rendering an rgb_array.
+    """
+    env = MinesweeperEnv(seed=seed, **board)
+    env.step(0)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        env.render("rgb_array")
+    return (time.perf_counter() - start) / repeats
+
+
+def bench_vector_steps(board, num_envs, steps, seed=0):
+    """
+    Return the amount of board steps per second of a VectorMinesweeperEnv.
+    """
+    env = VectorMinesweeperEnv(num_envs=num_envs, seed=seed, **board)
+    actions = np.random.default_rng(seed).integers(
+        env.single_action_space.n, size=(steps, num_envs))
+    start = time.perf_counter()
+    for step_actions in actions:
+        env.step(step_actions)
+    return steps * num_envs / (time.perf_counter() - start)
+
+
+def run(presets=tuple(PRESETS), steps=2000, resets=200, repeats=20,
+        num_envs=256, seed=0):
+    results = {}
+    for name in presets:
+        board = PRESETS[name]
+        cells = board["width"] * board["height"]
+        # Keep the time per preset roughly the same on larger boards.
+        scale = max(1, cells // 256)
+        results[name] = {
+            "board": board,
+            "steps per second": bench_steps(
+                board, max(steps // scale, 10), seed),
+            "resets per second": bench_resets(
+                board, max(resets // scale, 5), seed),
+            "worst flood fill seconds": bench_flood_fill(
+                board, max(repeats // scale, 3), seed),
+            "render seconds": bench_render(
+                board, max(repeats // scale, 3), seed),
+            "vector board steps per second": bench_vector_steps(
+                board, max(num_envs // scale, 1),
+                max(steps // num_envs, 5), seed),
+        }
+
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "gym": gym.__version__,
+        "seed": seed,
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split(
+        "\n")[0])
+    parser.add_argument("--presets", nargs="+", default=list(PRESETS),
+                        choices=list(PRESETS))
+    parser.add_argument("--steps", type=int, default=2000)
+    parser.add_argument("--resets", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--num-envs", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = run(args.presets, steps=args.steps, resets=args.resets,
+                  repeats=args.repeats, num_envs=args.num_envs,
+                  seed=args.seed)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1 +1,23 @@
+import importlib
+
+from gym_minesweeper.envs.board_pool import BoardPool
 from gym_minesweeper.envs.minesweeper_env import MinesweeperEnv
+
+# The other envs are imported when they are first used, so processes that
+# only play MinesweeperEnv do not import multiprocessing and gym.vector.
+_LAZY_ENVS = {
+    "VectorMinesweeperEnv": "gym_minesweeper.envs.vector_minesweeper_env",
+    "SharedMemoryVectorEnv": "gym_minesweeper.envs.shared_memory_vector_env",
+    "LargeMinesweeperEnv": "gym_minesweeper.envs.large_minesweeper_env",
+}
+
+__all__ = ["BoardPool", "MinesweeperEnv"] + list(_LAZY_ENVS)
+
+
+def __getattr__(name):
+    if name not in _LAZY_ENVS:
+        raise AttributeError("module {!r} has no attribute {!r}".format(
+            __name__, name))
+    env = getattr(importlib.import_module(_LAZY_ENVS[name]), name)
+    globals()[name] = env
+    return env
@@ -0,0 +1,141 @@
+import numpy as np
+
+NEIGHBORS = [(-1, -1), (0, -1), (1, -1),
+             (-1, 0), (0, 0), (1, 0),
+             (-1, 1), (0, 1), (1, 1)]
+
+
+def episode_rng(seed_sequence, *key):
+    """
+    Create the random generator for one episode, so that any episode can be
+    replayed from the seed and its key (for example its episode index)
+    without replaying the episodes before it.
+    """
+    return np.random.default_rng(np.random.SeedSequence(
+        seed_sequence.entropy, spawn_key=seed_sequence.spawn_key + key))
+
+
+def place_mines(rng, cell_count, mine_count, exclude=None):
+    """
+    Choose mine_count distinct cells out of cell_count, never choosing any of
+    the flat indices in `exclude`. Returns a flat boolean mask.
+    """
+    mines = np.zeros(cell_count, dtype=bool)
+    if exclude is None:
+        mines[rng.choice(cell_count, size=mine_count, replace=False)] = True
+    else:
+        candidates = np.delete(np.arange(cell_count), exclude)
+        mines[rng.choice(candidates, size=mine_count, replace=False)] = True
+    return mines
+
+
+def safe_cells(x, y, width, height, mine_count, opening=False):
+    """
+    The flat indices of the cells that may not hold a mine when the first
+    move digs (x, y). That is only (x, y) itself, or with opening=True its
+    whole 3x3 neighborhood, so that the first move always opens a region.
+    If there are too many mines to keep the neighborhood free, only (x, y)
+    is kept free.
+    """
+    if opening:
+        xs = np.arange(max(x - 1, 0), min(x + 2, width))
+        ys = np.arange(max(y - 1, 0), min(y + 2, height))
+        cells = (xs[:, None] * height + ys).ravel()
+        if width * height - cells.size >= mine_count:
+            return cells
+    return np.array([x * height + y])
+
+
+def neighbor_mine_counts(mines):
+    """
+    Count the mines in the 3x3 neighborhood of every cell.
+
+    Works on a single board of shape (width, height) or on a stack of boards
+    of shape (..., width, height). The cell itself is included in its own
+    neighborhood, so an unopened mine never has a count of 0.
+    """
+    mines = np.asarray(mines, dtype=bool)
+    width, height = mines.shape[-2:]
+    padding = [(0, 0)] * (mines.ndim - 2) + [(1, 1), (1, 1)]
+    padded = np.pad(mines, padding).astype(np.int8)
+    counts = np.zeros(mines.shape, dtype=np.int8)
+    for dx, dy in NEIGHBORS:
+        counts += padded[..., 1 + dx:1 + dx + width, 1 + dy:1 + dy + height]
+    return counts
+
+
+def dilate(mask):
+    """
+    Grow a boolean mask of shape (..., width, height) by one cell in every
+    direction, including diagonals.
+    """
+    mask = np.asarray(mask, dtype=bool)
+    width, height = mask.shape[-2:]
+    padding = [(0, 0)] * (mask.ndim - 2) + [(1, 1), (1, 1)]
+    padded = np.pad(mask, padding)
+    grown = np.zeros(mask.shape, dtype=bool)
+    for dx, dy in NEIGHBORS:
+        grown |= padded[..., 1 + dx:1 + dx + width, 1 + dy:1 + dy + height]
+    return grown
+
+
+def label_zero_regions(counts):
+    """
+    Label the 8-connected regions of cells without neighboring mines.
+
+    Every cell in a region gets the flat index of the first cell of that
+    region as its label, and cells that are not part of any region get -1.
+    Like neighbor_mine_counts, this works on a stack of boards, in which case
+    the flat indices refer to the whole stack and regions never cross boards.
+    """
+    zero = np.asarray(counts) == 0
+    width, height = zero.shape[-2:]
+    size = zero.size
+    padding = [(0, 0)] * (zero.ndim - 2) + [(1, 1), (1, 1)]
+    labels = np.where(zero, np.arange(size).reshape(zero.shape), size)
+    while True:
+        padded = np.pad(labels, padding, constant_values=size)
+        smallest = labels
+        for dx, dy in NEIGHBORS:
+            smallest = np.minimum(
+                smallest,
+                padded[..., 1 + dx:1 + dx + width, 1 + dy:1 + dy + height])
+        smallest = np.where(zero, smallest, size)
+
+        # Pointer jumping: follow every label to the label of the cell it
+        # points at, which makes long regions converge in a few iterations.
+        jumped = np.append(smallest.ravel(), size)[smallest]
+        if np.array_equal(jumped, labels):
+            break
+        labels = jumped
+
+    labels[labels == size] = -1
+    return labels
+
+
+def region_cells(labels):
+    """
+    Find the cells that are revealed when a zero region is opened.
+
+    Opening a region reveals the region itself and every cell bordering it.
+    Returns a tuple (keys, cells) of flat arrays sorted by region label, so
+    that the cells of the region with label `label` are
+    cells[searchsorted(keys, label, "left"):searchsorted(keys, label, "right")]
+    """
+    labels = np.asarray(labels)
+    width, height = labels.shape[-2:]
+    size = labels.size
+    padding = [(0, 0)] * (labels.ndim - 2) + [(1, 1), (1, 1)]
+    padded = np.pad(labels, padding, constant_values=-1)
+    indices = np.arange(size).reshape(labels.shape)
+
+    keys = []
+    for dx, dy in NEIGHBORS:
+        neighbor_labels = padded[..., 1 + dx:1 + dx + width,
+                                 1 + dy:1 + dy + height]
+        bordering = neighbor_labels >= 0
+        keys.append(neighbor_labels[bordering].astype(np.int64) * size +
+                    indices[bordering])
+
+    keys = np.unique(np.concatenate(keys))
+    return keys // size, keys % size
@@ -0,0 +1,131 @@
+import numpy as np
+
+from gym_minesweeper.envs.board import label_zero_regions, neighbor_mine_counts
+
+
+class BoardPool:
+    """
+    A pool of boards that are generated in batches, so that resetting an
+    env does not have to place mines, count neighbors and label zero regions
+    one board at a time.
+
+    Every board is stored with its neighbor mine counts and the labels of
+    its zero regions, see gym_minesweeper.envs.board. take() hands out the
+    boards in order, and when the pool is drained, the next batch of size
+    boards is generated at once. A pool that is loaded from a file is fixed
+    instead, and starts over from its first board.
+
+    Pass the pool to MinesweeperEnv(board_pool=...). Several envs may share
+    one pool.
+    """
+
+    def __init__(self, width, height, mine_count, size=1024, seed=None):
+        if not 0 <= mine_count < width * height:
+            raise ValueError("Can not place {} mines on a {}x{} board".format(
+                mine_count, width, height))
+        self.width = width
+        self.height = height
+        self.mine_count = mine_count
+        self.size = size
+        self.fixed = False
+        self._rng = np.random.default_rng(seed)
+        self._refill()
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a fixed pool, for example an evaluation set, from a .npy file
+        with the mines of shape (boards, width, height), or from a .npz file
+        written by save().
+        """
+        data = np.load(path)
+        if isinstance(data, np.ndarray):
+            data = {"mines": data}
+        mines = np.asarray(data["mines"], dtype=bool)
+        mine_counts = np.count_nonzero(mines, axis=(1, 2))
+        if np.any(mine_counts != mine_counts[0]):
+            raise ValueError("The boards in {} have different amounts of "
+                             "mines".format(path))
+
+        pool = cls.__new__(cls)
+        pool.size, pool.width, pool.height = mines.shape
+        pool.mine_count = int(mine_counts[0])
+        pool.fixed = True
+        if "neighbor_mines" in data and "zero_regions" in data:
+            pool._set_boards(mines, data["neighbor_mines"],
+                             data["zero_regions"])
+        else:
+            pool._set_boards(mines)
+        return pool
+
+    def save(self, path):
+        """
+        Save the boards that have not been taken yet to a .npz file, which
+        load() reads as a fixed pool.
+        """
+        np.savez(path, mines=self.mines[self._position:],
+                 neighbor_mines=self.neighbor_mines[self._position:],
+                 zero_regions=self.zero_regions[self._position:])
+
+    def take(self, exclude=None):
+        """
+        Take the next board whose mines are not on any of the flat indices
+        in `exclude`. Boards that are skipped are discarded, which leaves
+        the remaining boards as random as placing the mines around the
+        excluded cells.
+
+        Returns
+        -------
+        mines, neighbor_mines, zero_regions : tuple
+            Copies of the mines, neighbor mine counts and zero region labels
+            of the board, each of shape (width, height).
+        """
+        searched = 0
+        while True:
+            if self._position == self.size:
+                if not self.fixed:
+                    self._refill()
+                self._position = 0
+            start = self._position
+            if exclude is None:
+                index = start
+            else:
+                flat_mines = self.mines[start:].reshape(self.size - start, -1)
+                fits = np.flatnonzero(np.logical_not(
+                    flat_mines[:, exclude].any(axis=1)))
+                searched += self.size - start
+                if not fits.size:
+                    if self.fixed and searched >= self.size:
+                        raise ValueError("No board in the pool keeps the "
+                                         "excluded cells free")
+                    self._position = self.size
+                    continue
+                index = start + fits[0]
+            self._position = index + 1
+            return (self.mines[index].copy(),
+                    self.neighbor_mines[index].copy(),
+                    self.zero_regions[index].copy())
+
+    def _refill(self):
+        cell_count = self.width * self.height
+        # The mine_count cells with the smallest random keys get a mine.
+        keys = self._rng.random((self.size, cell_count))
+        chosen = np.argpartition(keys, self.mine_count, axis=1)[
+            :, :self.mine_count]
+        mines = np.zeros((self.size, cell_count), dtype=bool)
+        np.put_along_axis(mines, chosen, True, axis=1)
+        self._set_boards(mines.reshape(self.size, self.width, self.height))
+
+    def _set_boards(self, mines, neighbor_mines=None, zero_regions=None):
+        if neighbor_mines is None or zero_regions is None:
+            neighbor_mines = neighbor_mine_counts(mines)
+            # The labels of a stack are flat indices in the whole stack, so
+            # subtract the start of every board.
+            labels = label_zero_regions(neighbor_mines)
+            offsets = (np.arange(len(mines)) * self.width *
+                       self.height)[:, None, None]
+            zero_regions = np.where(labels >= 0, labels - offsets, -1)
+        self.mines = mines
+        self.neighbor_mines = np.asarray(neighbor_mines, dtype=np.int8)
+        self.zero_regions = np.asarray(zero_regions, dtype=np.int32)
+        self._position = 0
@@ -0,0 +1,324 @@
+import gym
+import numpy as np
+
+from gym_minesweeper.envs.board import (NEIGHBORS, episode_rng,
+                                         label_zero_regions,
+                                         neighbor_mine_counts, place_mines,
+                                         region_cells)
+from gym_minesweeper.rendering import RgbRenderer
+
+
+class _Tile:
+    __slots__ = ["mines", "open_cells", "neighbor_mines", "zero_regions"]
+
+    def __init__(self, mines):
+        self.mines = mines
+        self.open_cells = np.zeros(mines.shape, dtype=bool)
+        self.neighbor_mines = None
+        self.zero_regions = None
+
+
+class LargeMinesweeperEnv(gym.Env):
+    """
+    Minesweeper on boards that are too large to store as whole arrays.
+
+    The board is split into square tiles of tile_size cells, and the mines of
+    a tile are only generated, from the seed, the episode and the tile
+    position, once a cell in or next to the tile is opened. Every tile has
+    round(density * cells in the tile) mines.
+
+    The agent only sees a window of window_size x window_size cells around
+    its cursor. Actions dig a cell in that window, in the same z-order as in
+    MinesweeperEnv, and move the cursor to the dug cell, so the window is
+    centered on it (but never leaves the board). The cost of a step does not
+    depend on the size of the board, only on the amount of cells it opens.
+
+    Rewards are the same as in MinesweeperEnv.
+    """
+    metadata = {'render.modes': ["ansi", "rgb_array"]}
+    reward_range = (-float(1), float(1))
+
+    def __init__(self, width=1000, height=1000, density=0.15,
+                 window_size=16, tile_size=64, flood_fill=True,
+                 punishment=0.01, seed=None, first_move_safe=True,
+                 compact=False, render_zoom=20):
+        if not window_size <= min(width, height):
+            raise ValueError("window_size must not be larger than the board")
+        self.width = width
+        self.height = height
+        self.density = density
+        self.window_size = window_size
+        self.tile_size = tile_size
+        self.flood_fill = flood_fill
+        self.punishment = punishment
+        self.first_move_safe = first_move_safe
+        self.compact = compact
+        self.observation_dtype = np.int8 if compact else np.float32
+        self.mines_count = self._count_mines()
+
+        self.observation_space = gym.spaces.Box(
+            low=-2, high=8, shape=(window_size, window_size),
+            dtype=self.observation_dtype)
+        self.action_space = gym.spaces.Discrete(window_size * window_size)
+        self.rgb_renderer = RgbRenderer(zoom=render_zoom)
+
+        self.seed(seed)
+        self.reset()
+
+    def seed(self, seed=None):
+        """
+        Seed the env like MinesweeperEnv.seed(). The mines of a tile only
+        depend on the seed, the episode index and the position of the tile.
+        """
+        self._seed_sequence = np.random.SeedSequence(seed)
+        self.episode = -1
+        return [self._seed_sequence.entropy]
+
+    def reset(self, seed=None, episode=None):
+        if seed is not None:
+            self.seed(seed)
+        if episode is None:
+            episode = self.episode + 1
+        self.episode = episode
+
+        self.tiles = {}
+        self.cursor = (self.width // 2, self.height // 2)
+        self._safe_cell = None
+        self.steps = 0
+        self.unnecessary_steps = 0
+        self.opened_cells_count = 0
+        self.mine_opened = False
+        return self._get_observation()
+
+    def step(self, action):
+        """
+        Dig the cell at index `action` of the current window. See
+        MinesweeperEnv.step() for the rewards.
+
+        Returns
+        -------
+        ob, reward, episode_over, info : tuple
+            ob (np.ndarray) :
+                The window of shape (window_size, window_size) around the dug
+                cell, with the same values as the observations of
+                MinesweeperEnv.
+            info (dict) :
+                opened cells, steps, unnecessary steps and game over like
+                MinesweeperEnv, plus:
+                    opened cell: The (x, y) coordinates on the whole board of
+                        the cell that was dug this step.
+                    window origin: The (x, y) coordinates on the whole board
+                        of the upper left cell of the returned window.
+                    generated tiles: The amount of tiles that have been
+                        generated in this episode.
+        """
+        if not 0 <= action < self.action_space.n:
+            raise ValueError("action must be in [0, {}), not {}".format(
+                self.action_space.n, action))
+        origin_x, origin_y = self.window_origin
+        x = origin_x + action % self.window_size
+        y = origin_y + action // self.window_size
+        if self.steps == 0 and self.first_move_safe:
+            self._safe_cell = (x, y)
+
+        self.steps += 1
+        self._open_cell(x, y)
+        self.cursor = (x, y)
+
+        observation = self._get_observation()
+        info = {
+            "opened cells": self.opened_cells_count,
+            "steps": self.steps,
+            "unnecessary steps": self.unnecessary_steps,
+            "game over": self.mine_opened,
+            "opened cell": (x, y),
+            "window origin": self.window_origin,
+            "generated tiles": len(self.tiles),
+        }
+        return observation, self._get_reward(), self._is_done(), info
+
+    @property
+    def window_origin(self):
+        half = self.window_size // 2
+        x = min(max(self.cursor[0] - half, 0), self.width - self.window_size)
+        y = min(max(self.cursor[1] - half, 0), self.height - self.window_size)
+        return x, y
+
+    def render(self, mode="ansi"):
+        observation = self._get_observation()
+        if mode == "ansi":
+            characters = {-2: "B", -1: "x", 0: "."}
+            return "\n".join(
+                "".join(characters.get(cell, str(int(cell))) for cell in row)
+                for row in observation.T)
+        elif mode == "rgb_array":
+            return self.rgb_renderer.render(observation)
+        else:
+            raise ValueError("Did not understand rendering mode. Use any of "
+                             "mode={}".format(self.metadata["render.modes"]))
+
+    def _tile_mine_count(self, width, height):
+        cells = width * height
+        return min(int(round(self.density * cells)), cells - 1)
+
+    def _count_mines(self):
+        full_x, rest_x = divmod(self.width, self.tile_size)
+        full_y, rest_y = divmod(self.height, self.tile_size)
+        count = 0
+        for tiles_x, tile_width in [(full_x, self.tile_size), (1, rest_x)]:
+            for tiles_y, tile_height in [(full_y, self.tile_size),
+                                         (1, rest_y)]:
+                if tile_width and tile_height:
+                    count += tiles_x * tiles_y * self._tile_mine_count(
+                        tile_width, tile_height)
+        return count
+
+    def _get_tile(self, tile_x, tile_y):
+        tile = self.tiles.get((tile_x, tile_y))
+        if tile is None:
+            left = tile_x * self.tile_size
+            top = tile_y * self.tile_size
+            width = min(self.tile_size, self.width - left)
+            height = min(self.tile_size, self.height - top)
+
+            exclude = None
+            if self._safe_cell is not None:
+                safe_x, safe_y = self._safe_cell
+                if (left <= safe_x < left + width and
+                        top <= safe_y < top + height):
+                    exclude = [(safe_x - left) * height + safe_y - top]
+
+            rng = episode_rng(self._seed_sequence, self.episode, tile_x,
+                              tile_y)
+            mines = place_mines(rng, width * height,
+                                self._tile_mine_count(width, height),
+                                exclude=exclude)
+            tile = _Tile(mines.reshape(width, height))
+            self.tiles[(tile_x, tile_y)] = tile
+        return tile
+
+    def _get_neighbor_mines(self, tile_x, tile_y, tile):
+        if tile.neighbor_mines is None:
+            width, height = tile.mines.shape
+            padded = np.zeros((width + 2, height + 2), dtype=bool)
+            for dx, dy in NEIGHBORS:
+                neighbor_x, neighbor_y = tile_x + dx, tile_y + dy
+                if (neighbor_x < 0 or neighbor_y < 0 or
+                        neighbor_x * self.tile_size >= self.width or
+                        neighbor_y * self.tile_size >= self.height):
+                    continue
+                mines = self._get_tile(neighbor_x, neighbor_y).mines
+                source_x = {-1: slice(-1, None), 0: slice(None),
+                            1: slice(0, 1)}[dx]
+                source_y = {-1: slice(-1, None), 0: slice(None),
+                            1: slice(0, 1)}[dy]
+                target_x = {-1: slice(0, 1), 0: slice(1, -1),
+                            1: slice(-1, None)}[dx]
+                target_y = {-1: slice(0, 1), 0: slice(1, -1),
+                            1: slice(-1, None)}[dy]
+                padded[target_x, target_y] = mines[source_x, source_y]
+            tile.neighbor_mines = neighbor_mine_counts(padded)[1:-1, 1:-1]
+        return tile.neighbor_mines
+
+    def _is_open(self, x, y):
+        tile = self.tiles.get((x // self.tile_size, y // self.tile_size))
+        return tile is not None and tile.open_cells[x % self.tile_size,
+                                                    y % self.tile_size]
+
+    def _open_cell(self, x, y):
+        if self._is_open(x, y):
+            self.unnecessary_steps += 1
+            return
+
+        pending = [(x, y)]
+        while pending:
+            x, y = pending.pop()
+            tile_x, tile_y = x // self.tile_size, y // self.tile_size
+            local_x, local_y = x % self.tile_size, y % self.tile_size
+            tile = self._get_tile(tile_x, tile_y)
+            if tile.open_cells[local_x, local_y]:
+                continue
+            neighbor_mines = self._get_neighbor_mines(tile_x, tile_y, tile)
+
+            if not (self.flood_fill and neighbor_mines[local_x, local_y] == 0):
+                tile.open_cells[local_x, local_y] = True
+                self.opened_cells_count += 1
+                if tile.mines[local_x, local_y]:
+                    self.mine_opened = True
+                continue
+
+            if tile.zero_regions is None:
+                labels = label_zero_regions(neighbor_mines)
+                tile.zero_regions = (labels,) + region_cells(labels)
+            labels, keys, cells = tile.zero_regions
+            label = labels[local_x, local_y]
+            cells = cells[np.searchsorted(keys, label, side="left"):
+                          np.searchsorted(keys, label, side="right")]
+            cells = cells[np.logical_not(tile.open_cells.flat[cells])]
+            tile.open_cells.flat[cells] = True
+            self.opened_cells_count += cells.size
+
+            # The zero cells of the region on the edge of the tile also open
+            # their neighbors in the surrounding tiles.
+            region = labels == label
+            region[1:-1, 1:-1] = False
+            pending.extend(self._cells_around(
+                np.argwhere(region) + (tile_x * self.tile_size,
+                                       tile_y * self.tile_size),
+                tile_x, tile_y))
+
+    def _cells_around(self, cells, tile_x, tile_y):
+        """
+        The cells next to `cells` that lie on the board, outside tile
+        (tile_x, tile_y).
+        """
+        around = (cells[:, None, :] + np.array(NEIGHBORS)).reshape(-1, 2)
+        on_board = np.logical_and.reduce([
+            around[:, 0] >= 0, around[:, 0] < self.width,
+            around[:, 1] >= 0, around[:, 1] < self.height])
+        around = around[on_board]
+        outside = np.logical_or(around[:, 0] // self.tile_size != tile_x,
+                                around[:, 1] // self.tile_size != tile_y)
+        return [tuple(cell) for cell in np.unique(around[outside], axis=0)]
+
+    def _get_observation(self):
+        origin_x, origin_y = self.window_origin
+        size = self.window_size
+        observation = np.full((size, size), -1, dtype=self.observation_dtype)
+
+        for tile_x in range(origin_x // self.tile_size,
+                            (origin_x + size - 1) // self.tile_size + 1):
+            for tile_y in range(origin_y // self.tile_size,
+                                (origin_y + size - 1) // self.tile_size + 1):
+                tile = self.tiles.get((tile_x, tile_y))
+                if tile is None or tile.neighbor_mines is None:
+                    # Cells are only opened in tiles with neighbor counts.
+                    continue
+                left = tile_x * self.tile_size
+                top = tile_y * self.tile_size
+                x0, x1 = max(origin_x, left), min(origin_x + size,
+                                                  left + tile.mines.shape[0])
+                y0, y1 = max(origin_y, top), min(origin_y + size,
+                                                 top + tile.mines.shape[1])
+                tile_window = (slice(x0 - left, x1 - left),
+                               slice(y0 - top, y1 - top))
+
+                is_open = tile.open_cells[tile_window]
+                values = np.where(is_open, tile.neighbor_mines[tile_window],
+                                  -1)
+                values[np.logical_and(is_open, tile.mines[tile_window])] = -2
+                observation[x0 - origin_x:x1 - origin_x,
+                            y0 - origin_y:y1 - origin_y] = values
+        return observation
+
+    def _get_reward(self):
+        openable = self.width * self.height - self.mines_count
+        punishment = self.unnecessary_steps * self.punishment
+        open_cells_reward = (self.opened_cells_count - punishment) / openable
+        return (open_cells_reward - self.mine_opened -
+                self.mine_opened / openable)
+
+    def _is_done(self):
+        openable = self.width * self.height - self.mines_count
+        all_opened = self.opened_cells_count == openable
+        return self.mine_opened or all_opened
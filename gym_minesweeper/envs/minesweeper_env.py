@@ -1,40 +1,114 @@
-import random
+import struct
 
-import cv2
 import gym
 import numpy as np
 
+from gym_minesweeper.envs.board import (episode_rng, label_zero_regions,
+                                         neighbor_mine_counts, place_mines,
+                                         region_cells, safe_cells)
+from gym_minesweeper.envs.board_pool import BoardPool
+from gym_minesweeper.profiling import PhaseTimer, StepStats, clock
+from gym_minesweeper.rendering import RgbRenderer
+
+
+INFO_LEVELS = ("none", "counters", "full")
+
+# The kinds of actions with extended_actions=True, in the order of the
+# action space.
+DIG, FLAG, CHORD = range(3)
+
+# episode, steps, unnecessary steps, opened cells, mine opened and mines
+# generated, followed by the packed mines, open cells and, with
+# extended_actions=True, flags.
+_STATE_HEADER = struct.Struct("<qIII??")
+
 
 class MinesweeperEnv(gym.Env):
-    metadata = {'render.modes': ["ansi", "rgb_array", "human"]}
+    metadata = {'render.modes': ["ansi", "rgb_array", "human", "monitor"]}
     reward_range = (-float(1), float(1))
 
     def __init__(self, width=8, height=8, mine_count=10, flood_fill=True,
-                 debug=True, punishment=0.01, seed=None, first_move_safe=True):
+                 debug=False, punishment=0.01, seed=None, first_move_safe=True,
+                 compact=False, info_level="full", first_move_opening=False,
+                 render_zoom=20, extended_actions=False, board_pool=None,
+                 profile=False, copy_observation=True, monitor_fps=30):
+        if info_level not in INFO_LEVELS:
+            raise ValueError("info_level must be one of {}, not {!r}".format(
+                INFO_LEVELS, info_level))
         self.first_move_safe = first_move_safe
+        self.first_move_opening = first_move_opening
         self.width = width
         self.height = height
         self.mines_count = mine_count
         self.debug = debug
         self.flood_fill = flood_fill
         self.punishment = punishment
+        self.compact = compact
+        self.observation_dtype = np.int8 if compact else np.float32
+        self.copy_observation = copy_observation
+        self.info_level = info_level
+        self.extended_actions = extended_actions
+        self._action_kinds = 3 if extended_actions else 1
+        if isinstance(board_pool, str):
+            board_pool = BoardPool.load(board_pool)
+        if board_pool is not None and (
+                (board_pool.width, board_pool.height, board_pool.mine_count)
+                != (width, height, mine_count)):
+            raise ValueError("The boards in the pool are {}x{} with {} mines"
+                             .format(board_pool.width, board_pool.height,
+                                     board_pool.mine_count))
+        self.board_pool = board_pool
+        # With profile=True, step() and reset() collect a StepStats, see
+        # gym_minesweeper.profiling.
+        self.stats = None
+        if profile:
+            self.stats = StepStats(trace_allocations=profile == "allocations")
 
         self.window = None
-        self.observation_space = gym.spaces.Box(low=np.float32(-2),
-                                                high=np.float32(8),
-                                                shape=(self.width, self.height))
-        self.action_space = gym.spaces.Discrete(self.width * self.height)
+        self.monitor_fps = monitor_fps
+        self.rgb_renderer = RgbRenderer(zoom=render_zoom)
+        # The window scales the image itself, so it gets one pixel per cell.
+        self._window_renderer = RgbRenderer(zoom=1)
+        self.observation_space = gym.spaces.Box(
+            low=-3 if extended_actions else -2, high=8,
+            shape=(self.width, self.height), dtype=self.observation_dtype)
+        self.action_space = gym.spaces.Discrete(
+            self._action_kinds * self.width * self.height)
         self.NEIGHBORS = [(-1, -1), (0, -1), (1, -1),
                           (-1, 0), (0, 0), (1, 0),
                           (-1, 1), (0, 1), (1, 1)]
-        self.open_cells = np.zeros((self.width, self.height))
-        random.seed(a=seed)
-        self.mines = self._generate_mines()
-        self.steps = 0
-        self.unnecessary_steps = 0
-
-        if self.debug:
-            self._assert_invariants()
+        self._neighbor_mines = None
+        self._zero_regions = None
+        self._zero_labels = None
+
+        # The boards of every episode are written into the same arrays.
+        self.open_cells = np.zeros((self.width, self.height), dtype=bool)
+        self.flags = np.zeros((self.width, self.height), dtype=bool)
+        # The mask is in action order, and _mask_cells is a view of it of
+        # shape (action kinds, width, height), indexed like open_cells.
+        self.action_mask = np.ones(
+            self._action_kinds * self.width * self.height, dtype=bool)
+        self._action_mask_view = self.action_mask.view()
+        self._action_mask_view.flags.writeable = False
+        self._mask_cells = self.action_mask.reshape(
+            self._action_kinds, self.height, self.width).transpose(0, 2, 1)
+        # The legal actions are also kept as an unordered set in the first
+        # _legal_count entries of _legal_set, and _legal_position holds the
+        # index of every action in it, or -1. Both are updated with the mask
+        # as cells are opened and flagged, see _set_legal.
+        self._legal_set = np.arange(self.action_space.n)
+        self._legal_position = np.arange(self.action_space.n)
+        self._legal_count = self.action_space.n
+        # The observation is updated in place as cells change, and the flat
+        # indices of the changed cells are collected in _changed_cells.
+        self._observation = np.full((self.width, self.height), -1,
+                                    dtype=self.observation_dtype)
+        self._observation_view = self._observation.view()
+        self._observation_view.flags.writeable = False
+        self._observation_stale = False
+        self._changed_cells = []
+        self.seed(seed)
+        self.reset()
 
     def step(self, action):
         """
@@ -51,12 +125,30 @@ class MinesweeperEnv(gym.Env):
             rules, eg. if you open a cell with 0 mines around it, a larger space
             will be opened.
 
+            With first_move_safe=True (the default), the mines are only
+            placed when the first cell is dug, and never on that cell. With
+            first_move_opening=True, they are also kept out of the neighbors
+            of that cell, so the first action opens a region.
+
+            With extended_actions=True, the action space has three actions
+            per cell: action + width * height flags or unflags the cell,
+            and action + 2 * width * height chords it. Flagged cells are not
+            dug, and a chord on an opened number with as many flagged
+            neighbors as the number digs all its other closed neighbors at
+            once. Flood fills open flagged cells too, and remove their flag.
+            Digging a flagged cell, flagging an opened cell, and chords that
+            open nothing are unnecessary steps.
+
         Returns
         -------
         ob, reward, episode_over, info : tuple
             ob (np.ndarray) :
-                An int array of shape (width, height) with integer values
-                ranging from -2 to 8 where
+                An array of shape (width, height) with integer values
+                ranging from -2 to 8, of dtype float32, or int8 if the env
+                was created with compact=True. With copy_observation=False,
+                it is a read-only view of the board that the env updates in
+                place, instead of a new array. The values are
+                -3 = flagged cell (only with extended_actions=True)
                 -2 = opened mine
                 -1 = closed cell
                 0-8 = Amount of mines in the surrounding cells
@@ -71,43 +163,102 @@ class MinesweeperEnv(gym.Env):
                 If a mine has been pressed. If reset() is not called, you could
                 theoretically continue playing, but this is not advised.
             info (dict) :
-                 diagnostic information useful for debugging.
+                 diagnostic information useful for debugging. Empty if the
+                 env was created with info_level="none", and without the
+                 mine locations if info_level="counters".
                  Includes:
                     opened cells: Amount of opened cells. Affects reward.
                     steps: The amount of steps taken in this episode.
                     unnecessary steps: The amount of steps that had no effect.
                     game over: If a mine has been opened
-                    died this turn: If a mine has been opened this turn.
                     mine locations: The location of all the mines.
                     opened cell: The (x, y) coordinates of the cell that was
                         opened this step.
+                    action mask: A boolean array of the size of the action
+                        space, that is True for every action that digs a
+                        closed cell, and with extended_actions=True, for
+                        flagging closed cells and chording opened numbers.
+                        With info_level="counters", this is a read-only
+                        view that the next step updates in place.
+                    changed cells: The flat indices into ob of the cells that
+                        changed this step, so that
+                        ob.flat[changed cells] = changed values updates the
+                        previous observation to this one.
+                    changed values: The new values of those cells.
                  Official evaluations of your agent are not allowed to
                  use this for learning.
         """
+        if self.stats is not None:
+            return self._profiled_step(action)
 
-        first_move = False
-        if self.steps == 0:
-            first_move = True
-            assert self._get_reward() == 0
+        kind, x, y = self._check_action(action)
+        if not self._mines_generated and self._reveals(kind, x, y):
+            self._place_first_mines(x, y)
+        self._apply_action(kind, x, y)
+        if self.debug:
+            self._debug_checks()
+
+        return self._get_state(action)
 
-        if self._get_reward() == 0:
-            assert self.steps == 0
+    def _profiled_step(self, action):
+        stats = self.stats
+        stats.start_step()
+        opened_cells_count = self.opened_cells_count
+        timer = PhaseTimer(stats)
+
+        kind, x, y = self._check_action(action)
+        timer.lap("checks")
+        if not self._mines_generated and self._reveals(kind, x, y):
+            self._place_first_mines(x, y)
+            timer.lap("mines")
+        self._apply_action(kind, x, y)
+        timer.lap("action")
+        if self.debug:
+            self._debug_checks()
+            timer.lap("invariants")
 
-        self.steps += 1
+        observation = self._get_observation()
+        timer.lap("observation")
+        reward = self._get_reward()
+        timer.lap("reward")
+        done = self._is_done()
+        timer.lap("done")
+        info = self._get_info(action)
+        timer.lap("info")
+        stats.end_step(self.opened_cells_count - opened_cells_count)
+        return observation, reward, done, info
 
+    def _check_action(self, action):
+        if not 0 <= action < self.action_space.n:
+            raise ValueError("action must be in [0, {}), not {}".format(
+                self.action_space.n, action))
         x, y = self._parse_action(action)
-        self._open_cell(x, y)
+        return action // (self.width * self.height), x, y
 
-        if first_move and self._game_over() and self.first_move_safe:
-            self.reset()
-            self.step(action)
+    def _reveals(self, kind, x, y):
+        # Before the mines are placed, no cell is open, so chords do
+        # nothing, and only digging an unflagged cell reveals it.
+        return kind == DIG and not self.flags[x, y]
 
-        if self.debug and self._game_over():
-            print("game over")
-        if self.debug:
-            self._assert_invariants()
+    def _place_first_mines(self, x, y):
+        self._place_mines(exclude=safe_cells(
+            x, y, self.width, self.height, self.mines_count,
+            opening=self.first_move_opening))
 
-        return self._get_state(action)
+    def _apply_action(self, kind, x, y):
+        self._changed_cells = []
+        self.steps += 1
+        if kind == DIG:
+            self._open_cell(x, y)
+        elif kind == FLAG:
+            self._toggle_flag(x, y)
+        else:
+            self._chord(x, y)
+
+    def _debug_checks(self):
+        if self._game_over():
+            print("game over")
+        self._assert_invariants()
 
     def _get_state(self, action):
         observation = self._get_observation()
@@ -116,17 +267,267 @@ class MinesweeperEnv(gym.Env):
         info = self._get_info(action)
         return observation, reward, done, info
 
-    def reset(self):
-        self.open_cells = np.zeros((self.width, self.height))
-        self.mines = self._generate_mines()
+    def seed(self, seed=None):
+        """
+        Seed the generator of this env. The next call to reset() starts
+        episode 0 of this seed, and every later reset() starts the next
+        episode. The mine layout of an episode only depends on the seed and
+        the episode index. The action space, which sample_legal() draws
+        from, is seeded from the same seed.
+        """
+        self._seed_sequence = np.random.SeedSequence(seed)
+        # The episodes use the children of the seed sequence, so its own
+        # state is free for the action space.
+        self.action_space.seed(int(self._seed_sequence.generate_state(1)[0]))
+        self.episode = -1
+        return [self._seed_sequence.entropy]
+
+    def reset(self, seed=None, episode=None):
+        """
+        Start a new game.
+
+        Parameters
+        ----------
+        seed (int) :
+            If given, reseed the env before starting the game, see seed().
+        episode (int) :
+            If given, replay this episode of the current seed instead of
+            starting the next one.
+
+        If the env was created with a board_pool (a BoardPool, or the path
+        of a file to load one from), the mines are taken from the pool
+        instead, so they do not depend on the seed and episode.
+        """
+        start = clock() if self.stats is not None else None
+        if seed is not None:
+            self.seed(seed)
+        if episode is None:
+            episode = self.episode + 1
+        self.episode = episode
+        self.np_random = episode_rng(self._seed_sequence, episode)
+
+        self.open_cells[...] = False
+        self.flags[...] = False
+        self._observation[...] = -1
+        self._changed_cells = []
+        self.action_mask[...] = True
+        if self.extended_actions:
+            self._mask_cells[CHORD] = False
+        self._rebuild_legal_set()
+        if self.first_move_safe:
+            # The mines are placed on the first step, away from the first
+            # cell that is dug.
+            self.mines = np.zeros((self.width, self.height), dtype=bool)
+            self._neighbor_mines = np.zeros((self.width, self.height),
+                                            dtype=np.int8)
+            self._mines_generated = False
+        else:
+            self._place_mines()
+        self._observation_stale = False
         self.steps = 0
         self.unnecessary_steps = 0
+        self.opened_cells_count = 0
+        self.mine_opened = False
         if self.debug:
             self._assert_invariants()
-        return self._get_observation()
+        observation = self._get_observation()
+        if start is not None:
+            self.stats.add_phase("reset", clock() - start)
+        return observation
+
+    @property
+    def mines(self):
+        return self._mines
+
+    @mines.setter
+    def mines(self, mines):
+        self._mines = np.asarray(mines, dtype=bool)
+        self._mines_generated = True
+        # Cells may have been opened on the previous mines.
+        self._observation_stale = True
+        self._packed_mines = None
+        self._neighbor_mines = None
+        self._zero_regions = None
+        self._zero_labels = None
+
+    @property
+    def neighbor_mines(self):
+        """
+        The amount of mines around every cell, computed once per board.
+        """
+        if self._neighbor_mines is None:
+            self._neighbor_mines = neighbor_mine_counts(self.mines)
+        return self._neighbor_mines
+
+    def get_state(self):
+        """
+        Save the state of the current game as a small bytes object, with the
+        mines and open cells packed into bits, for example to restore it
+        with set_state() while searching a game tree.
+        """
+        if self._packed_mines is None:
+            self._packed_mines = np.packbits(self.mines).tobytes()
+        header = _STATE_HEADER.pack(
+            self.episode, self.steps, self.unnecessary_steps,
+            self.opened_cells_count, self.mine_opened, self._mines_generated)
+        state = header + self._packed_mines + np.packbits(
+            self.open_cells).tobytes()
+        if self.extended_actions:
+            state += np.packbits(self.flags).tobytes()
+        return state
+
+    def set_state(self, state):
+        """
+        Restore a state from get_state() of this env, or of an env with the
+        same size and seed.
+
+        The open cells are written into the existing arrays, and if the
+        mines are the same as the current ones, the neighbor counts and
+        regions computed for them are kept, so restoring states of the same
+        game is cheap.
+        """
+        (self.episode, self.steps, self.unnecessary_steps,
+         self.opened_cells_count, self.mine_opened,
+         mines_generated) = _STATE_HEADER.unpack_from(state)
+        cell_count = self.width * self.height
+        size = (cell_count + 7) // 8
+        offset = _STATE_HEADER.size
+
+        if self._packed_mines is None:
+            self._packed_mines = np.packbits(self.mines).tobytes()
+        packed_mines = bytes(state[offset:offset + size])
+        if packed_mines != self._packed_mines:
+            self.mines = np.unpackbits(
+                np.frombuffer(packed_mines, dtype=np.uint8),
+                count=cell_count).view(bool).reshape(self.width, self.height)
+            self._packed_mines = packed_mines
+        self._mines_generated = mines_generated
+        if not mines_generated:
+            # The mines of the episode are still to be placed.
+            self.np_random = episode_rng(self._seed_sequence, self.episode)
+
+        self.open_cells[...] = np.unpackbits(
+            np.frombuffer(state, dtype=np.uint8, count=size,
+                          offset=offset + size),
+            count=cell_count).reshape(self.width, self.height)
+        if self.extended_actions:
+            self.flags[...] = np.unpackbits(
+                np.frombuffer(state, dtype=np.uint8, count=size,
+                              offset=offset + 2 * size),
+                count=cell_count).reshape(self.width, self.height)
+        self._mask_cells[...] = self._expected_mask_cells()
+        self._rebuild_legal_set()
+        self._observation_stale = True
+
+    def _expected_mask_cells(self):
+        closed = np.logical_not(self.open_cells)
+        if not self.extended_actions:
+            return closed[None]
+        numbers = np.logical_and(self.neighbor_mines > 0,
+                                 np.logical_not(self.mines))
+        return np.stack([np.logical_and(closed, np.logical_not(self.flags)),
+                         closed,
+                         np.logical_and(self.open_cells, numbers)])
+
+    def _rebuild_legal_set(self):
+        actions = np.flatnonzero(self.action_mask)
+        self._legal_count = actions.size
+        self._legal_set[:actions.size] = actions
+        self._legal_position[...] = -1
+        self._legal_position[actions] = np.arange(actions.size)
+
+    def _set_legal(self, kind, x, y, legal):
+        """
+        Mark the action of kind on cell (x, y) as legal or not, in the action
+        mask and the set of legal actions.
+        """
+        action = kind * self.width * self.height + y * self.width + x
+        if self.action_mask[action] == legal:
+            return
+        self.action_mask[action] = legal
+        if legal:
+            self._legal_set[self._legal_count] = action
+            self._legal_position[action] = self._legal_count
+            self._legal_count += 1
+        else:
+            # Move the last action of the set into the hole.
+            position = self._legal_position[action]
+            self._legal_count -= 1
+            last = self._legal_set[self._legal_count]
+            self._legal_set[position] = last
+            self._legal_position[last] = position
+            self._legal_position[action] = -1
+
+    def _set_legal_cells(self, kind, cells, legal):
+        """
+        Like _set_legal, for the cells with the given distinct flat indices.
+        legal is a bool, or a bool array with one entry per cell.
+        """
+        actions = (kind * self.width * self.height +
+                   cells % self.height * self.width + cells // self.height)
+        legal = np.broadcast_to(legal, actions.shape)
+        changed = self.action_mask[actions] != legal
+        actions = actions[changed]
+        legal = legal[changed]
+        self.action_mask[actions] = legal
+
+        removed = actions[np.logical_not(legal)]
+        if removed.size:
+            positions = self._legal_position[removed]
+            self._legal_position[removed] = -1
+            count = self._legal_count - removed.size
+            # The actions at the end of the set that stay fill the holes
+            # that the removed actions leave before the new end.
+            tail = self._legal_set[count:self._legal_count]
+            movers = tail[self._legal_position[tail] >= 0]
+            holes = positions[positions < count]
+            self._legal_set[holes] = movers
+            self._legal_position[movers] = holes
+            self._legal_count = count
+
+        added = actions[legal]
+        if added.size:
+            positions = np.arange(self._legal_count,
+                                  self._legal_count + added.size)
+            self._legal_set[positions] = added
+            self._legal_position[added] = positions
+            self._legal_count += added.size
 
     def legal_actions(self):
-        return np.flatnonzero(((self.open_cells - 1) * -1).T)
+        """
+        The legal actions in increasing order: the actions that dig a closed
+        cell that is not flagged, and with extended_actions also those that
+        flag or unflag a closed cell or chord an opened number.
+        """
+        return np.sort(self._legal_set[:self._legal_count])
+
+    def sample_legal(self):
+        """
+        A random action from legal_actions(), drawn with the generator of
+        the action space, so it does not change the mines of the episode.
+        Takes constant time, since it draws from the set of legal actions
+        that is updated on every step.
+        """
+        return int(self._legal_set[
+            self.action_space.np_random.randint(self._legal_count)])
+
+    def safe_actions(self):
+        """
+        The actions that dig a closed cell which the observation proves is
+        not a mine, see gym_minesweeper.solver.known_cells.
+        """
+        from gym_minesweeper.solver import known_cells
+        safe, _ = known_cells(self._get_observation())
+        return np.flatnonzero(safe.T)
+
+    def mine_probabilities(self):
+        """
+        The probability of every cell being a mine, given the observation
+        and the amount of mines, as an array of shape (width, height). See
+        gym_minesweeper.solver.mine_probabilities.
+        """
+        from gym_minesweeper.solver import mine_probabilities
+        return mine_probabilities(self._get_observation(), self.mines_count)
 
     def render(self, mode='human'):
         if self.debug:
@@ -142,6 +543,8 @@ class MinesweeperEnv(gym.Env):
                         character = "."
                     elif cell == -2:
                         character = "B"
+                    elif cell == -3:
+                        character = "F"
                     else:
                         character = str(int(cell))
 
@@ -159,21 +562,29 @@ class MinesweeperEnv(gym.Env):
             self.window.show(block=True)
 
         elif mode == 'human':
-            img = [[COLORS[cell] for cell in row] for row in
-                   self._get_observation()]
+            img = self._window_renderer.render(self._get_observation())
 
             self.window.set_caption(
                 "reward:" + str(np.round(self._get_reward(), 4)))
             self.window.show_img(img)
 
+        elif mode == "monitor":
+            # Shows the game without blocking and without mouse input, for
+            # watching an agent. Renders that come less than 1 / monitor_fps
+            # seconds after the last frame are skipped.
+            if not self.window:
+                from gym_minesweeper.window import Window
+                self.window = Window('gym_minesweeper',
+                                     max_fps=self.monitor_fps)
+                self.window.show(block=False)
+            if self.window.frame_due():
+                img = self._window_renderer.render(self._get_observation())
+                self.window.show_img(img, title="reward: " + str(
+                    np.round(self._get_reward(), 4)))
+
         elif mode == "rgb_array":
-            img = [[COLORS[cell] for cell in row] for row in
-                   self._get_observation()]
-            img = np.array(img, dtype=np.uint8)
-            zoom = 20
-            img = cv2.resize(img, dsize=(0, 0), fx=zoom, fy=zoom,
-                             interpolation=cv2.INTER_NEAREST)
-            return img
+            # The image is reused, and overwritten by the next render.
+            return self.rgb_renderer.render(self._get_observation())
         else:
             print("Did not understand rendering mode. Use any of mode=",
                   self.metadata["render.modes"])
@@ -182,166 +593,248 @@ class MinesweeperEnv(gym.Env):
         x = round(event.ydata)
         y = round(event.xdata)
         current_action = y * self.width + x
+        if self.extended_actions:
+            # Right click flags and middle click chords.
+            kind = {2: CHORD, 3: FLAG}.get(event.button, DIG)
+            current_action += kind * self.width * self.height
         self.step(current_action)
         self.render(mode="human")
 
     def close(self):
         if self.window:
             self.window.close()
+            self.window = None
 
     def _parse_action(self, action):
-        x = action % self.width
-        y = action // self.width
+        cell = action % (self.width * self.height)
+        x = cell % self.width
+        y = cell // self.width
         return x, y
 
     def _open_cell(self, x, y):
-        if self.open_cells[x, y]:
+        if self.open_cells[x, y] or self.flags[x, y]:
             self.unnecessary_steps += 1
+            return
+
+        if self.debug:
+            print("opening cell ({},{})".format(x, y))
+        if self.flood_fill and self.neighbor_mines[x, y] == 0:
+            cells = self._get_region_cells(x, y)
+            if self.stats is not None:
+                self.stats.region_sizes.add(cells.size)
+            self._reveal(cells)
         else:
-            if self.debug:
-                print("opening cell ({},{})".format(x, y))
-            self.open_cells[x, y] = 1
-            if self._get_neighbor_mines(x, y) == 0 and self.flood_fill:
-                for dx, dy in self.NEIGHBORS:
-                    ix, iy = (dx + x, dy + y)
-                    if (0 <= ix <= self.width - 1 and
-                            0 <= iy <= self.height - 1):
-                        # self.open_cells[ix, iy] = 1
-                        if (self._get_neighbor_mines(ix, iy) == 0 and
-                                not self.open_cells[ix, iy]):
-                            self._open_cell(ix, iy)
-                        else:
-                            self.open_cells[ix, iy] = 1
+            self.open_cells[x, y] = True
+            self._set_legal(DIG, x, y, False)
+            self.opened_cells_count += 1
+            if self.mines[x, y]:
+                self.mine_opened = True
+                self._observation[x, y] = -2
+            else:
+                self._observation[x, y] = self.neighbor_mines[x, y]
+            self._changed_cells.append(x * self.height + y)
+            if self.extended_actions:
+                # The cell is not flagged, or it could not be dug.
+                self._set_legal(FLAG, x, y, False)
+                self._set_legal(CHORD, x, y, bool(
+                    self.neighbor_mines[x, y] > 0 and not self.mines[x, y]))
+
+    def _reveal(self, cells):
+        """
+        Open the cells with the given flat indices, and update the counters
+        and the action mask.
+        """
+        cells = cells[self.open_cells.flat[cells] == 0]
+        self.open_cells.flat[cells] = True
+        self._set_legal_cells(DIG, cells, False)
+        self.opened_cells_count += cells.size
+        mines = self.mines.flat[cells]
+        self._observation.flat[cells] = np.where(
+            mines, -2, self.neighbor_mines.flat[cells])
+        self._changed_cells.append(cells)
+        if mines.any():
+            self.mine_opened = True
+        if self.extended_actions:
+            self.flags.flat[cells] = False
+            self._set_legal_cells(FLAG, cells, False)
+            self._set_legal_cells(CHORD, cells, np.logical_and(
+                self.neighbor_mines.flat[cells] > 0,
+                np.logical_not(mines)))
+
+    def _toggle_flag(self, x, y):
+        if self.open_cells[x, y]:
+            self.unnecessary_steps += 1
+            return
+        self.flags[x, y] = not self.flags[x, y]
+        self._set_legal(DIG, x, y, not self.flags[x, y])
+        self._observation[x, y] = -3 if self.flags[x, y] else -1
+        self._changed_cells.append(x * self.height + y)
+
+    def _chord(self, x, y):
+        window = (slice(max(x - 1, 0), x + 2), slice(max(y - 1, 0), y + 2))
+        targets = np.argwhere(np.logical_and(
+            np.logical_not(self.open_cells[window]),
+            np.logical_not(self.flags[window])))
+        if (not self.open_cells[x, y] or self.mines[x, y] or
+                not targets.size or
+                np.count_nonzero(self.flags[window]) !=
+                self.neighbor_mines[x, y]):
+            self.unnecessary_steps += 1
+            return
+
+        targets += (window[0].start, window[1].start)
+        cells = [targets[:, 0] * self.height + targets[:, 1]]
+        if self.flood_fill:
+            cells.extend(self._get_region_cells(target_x, target_y)
+                         for target_x, target_y in targets
+                         if self.neighbor_mines[target_x, target_y] == 0)
+            if self.stats is not None:
+                for region in cells[1:]:
+                    self.stats.region_sizes.add(region.size)
+        # The regions of the targets overlap each other and the targets.
+        self._reveal(np.unique(np.concatenate(cells)))
+
+    def _get_region_cells(self, x, y):
+        if self._zero_regions is None:
+            labels = self._zero_labels
+            if labels is None:
+                labels = label_zero_regions(self.neighbor_mines)
+            self._zero_regions = (labels,) + region_cells(labels)
+        labels, keys, cells = self._zero_regions
+        label = labels[x, y]
+        start = np.searchsorted(keys, label, side="left")
+        end = np.searchsorted(keys, label, side="right")
+        return cells[start:end]
 
     def _get_reward(self):
         openable = self.width * self.height - self.mines_count
-        open_cells = np.count_nonzero(self.open_cells)
-        open_mine = self._game_over()
+        open_cells = self.opened_cells_count
+        open_mine = self.mine_opened
         punishment = self.unnecessary_steps * self.punishment
         open_cells_reward = (open_cells - punishment) / openable
         return open_cells_reward - open_mine - open_mine / openable
 
-    def _generate_mines(self):
-        mines = np.zeros((self.width, self.height))
-        print("using seed")
-        mines1d = random.sample(range(self.width * self.height),
-                                self.mines_count)
-
-        for coord in mines1d:
-            x = coord % self.width
-            y = coord // self.width
-            mines[x, y] = 1
-
-        return mines
+    def _place_mines(self, exclude=None):
+        """
+        Place the mines of the episode, away from the flat indices in
+        exclude, either from the board pool or with the episode generator.
+        """
+        if self.board_pool is None:
+            self.mines = self._generate_mines(exclude=exclude)
+        else:
+            mines, neighbor_mines, labels = self.board_pool.take(exclude)
+            self.mines = mines
+            self._neighbor_mines = neighbor_mines
+            self._zero_labels = labels
+        # No cell is open yet, so the observation does not depend on them.
+        self._observation_stale = False
+
+    def _generate_mines(self, exclude=None):
+        mines = place_mines(self.np_random, self.width * self.height,
+                            self.mines_count, exclude=exclude)
+        return mines.reshape(self.width, self.height)
 
     def _get_observation(self):
-        self.open_cells
-        observation = np.zeros(self.open_cells.shape)
-        for ix, iy in np.ndindex(self.open_cells.shape):
-            is_open = self.open_cells[ix, iy]
-            is_mine = self.mines[ix, iy]
-
-            if not is_open:
-                observation[ix, iy] = -1
-            elif is_open and is_mine:
-                observation[ix, iy] = -2
-            elif is_open:
-                observation[ix, iy] = self._get_neighbor_mines(ix, iy)
-
-        return observation
+        if self._observation_stale:
+            self._observation[...] = self._compute_observation()
+            self._observation_stale = False
+        if self.copy_observation:
+            return self._observation.copy()
+        return self._observation_view
+
+    def _compute_observation(self):
+        observation = np.where(self.open_cells, self.neighbor_mines, -1)
+        observation[np.logical_and(self.open_cells, self.mines)] = -2
+        if self.extended_actions:
+            observation[self.flags] = -3
+        return observation.astype(self.observation_dtype)
 
     def _game_over(self):
-        logical_and = np.logical_and(self.open_cells, self.mines)
-        return np.any(logical_and)
+        return self.mine_opened
 
     def _get_neighbor_mines(self, x, y):
-        mine_count = 0
-        for dx, dy in self.NEIGHBORS:
-            ix, iy = (dx + x, dy + y)
-            if 0 <= ix <= self.width - 1 and \
-                    0 <= iy <= self.height - 1 and \
-                    self.mines[ix, iy]:
-                mine_count += 1
-        return mine_count
+        return self.neighbor_mines[x, y]
 
     def _get_info(self, action=None):
-        return {
-            "opened cells": np.count_nonzero(self.open_cells),
+        if self.info_level == "none":
+            return {}
+        info = {
+            "opened cells": self.opened_cells_count,
             "steps": self.steps,
             "unnecessary steps": self.unnecessary_steps,
             "game over": self._game_over(),
-            "mine locations": self.mines.astype(int),
-            "opened cell": self._parse_action(action)
+            "opened cell": self._parse_action(action),
         }
+        if self._changed_cells:
+            changed_cells = np.hstack(self._changed_cells).astype(np.intp)
+        else:
+            changed_cells = np.zeros(0, dtype=np.intp)
+        info["changed cells"] = changed_cells
+        info["changed values"] = self._observation.flat[changed_cells]
+        if self.info_level == "full":
+            info["action mask"] = self.action_mask.copy()
+            info["mine locations"] = self.mines.astype(int)
+        else:
+            # Updated in place by the next step.
+            info["action mask"] = self._action_mask_view
+        return info
 
     def _assert_invariants(self):
-        assert self._get_observation().shape == self.observation_space.shape
+        observation = self._get_observation()
+        assert observation.shape == self.observation_space.shape
+        assert observation.dtype == self.observation_space.dtype
+        assert np.array_equal(observation, self._compute_observation()), \
+            "The observation does not match the board"
+
+        opened = np.count_nonzero(self.open_cells)
+        opened_mines = np.count_nonzero(
+            np.logical_and(self.open_cells, self.mines))
+        assert self.opened_cells_count == opened, \
+            "Counted {} opened cells, but {} cells are open".format(
+                self.opened_cells_count, opened)
+        assert np.array_equal(self._mask_cells, self._expected_mask_cells()), \
+            "The action mask does not match the board"
+        legal = self._legal_set[:self._legal_count]
+        assert np.array_equal(np.sort(legal),
+                              np.flatnonzero(self.action_mask)), \
+            "The set of legal actions does not match the action mask"
+        assert np.array_equal(self._legal_position[legal],
+                              np.arange(self._legal_count)), \
+            "The positions of the legal actions are wrong"
+        assert np.count_nonzero(self._legal_position >= 0) == legal.size, \
+            "Actions that are not legal have a position"
+        assert not np.logical_and(self.flags, self.open_cells).any(), \
+            "Opened cells are flagged"
+        # A chord next to wrong flags can open several mines at once.
+        assert (opened_mines > 0) == self.mine_opened, \
+            "Game over is {}, but {} mines are open".format(
+                self.mine_opened, opened_mines)
 
+        reward = self._get_reward()
+        if self.steps == 0:
+            assert reward == 0, \
+                "No steps were taken, but score is {}".format(reward)
         if self._game_over():
-            assert (
-                -1 <= self._get_reward() < 0,
-                "Game is over, but score is {}".format(self._get_reward())
-            )
-            assert (
-                np.count_nonzero(np.logical_and(self.open_cells, self.mines)) == 1,
-                "Game is over, but opened cells is {}".format(
-                    np.count_nonzero(np.logical_and(self.open_cells, self.mines))
-                )
-            )
+            assert reward < 0, \
+                "Game is over, but score is {}".format(reward)
         else:
-            assert (
-                0 <= self._get_reward() < 1,
-                "Game is not over, but score is {}".format(self._get_reward()))
-            assert (
-                np.count_nonzero(np.logical_and(self.open_cells, self.mines)) == 0,
-                "Game is not over, but opened mines: {}".format(
-                    np.count_nonzero(np.logical_and(self.open_cells, self.mines))
-                )
-            )
-
-        assert (
-            (np.count_nonzero(self.open_cells) == 1 and self._game_over())
-            == (self._get_reward() == -1),
-            "Game over: {}, mines opened: {}, but score is {}".format(
-                self._game_over(), np.count_nonzero(self.open_cells),
-                self._get_reward()
-            )
-        )
-
-        assert (
-            (np.count_nonzero(self.open_cells) == self.width * self.height)
-            == (self._get_reward() == 1),
-            "The game is won ({}), and the score should be 1, "
-            "but the score is {}".format(
-                np.count_nonzero(self.open_cells) == self.width * self.height,
-                self._get_reward()
-            )
-        )
-
-        assert (
-            (np.count_nonzero(self.open_cells) == 0)
-            == (self._get_reward() == 0),
-            "The game has just started, but the reward is not zero. "
-            "reward:{}".format(self._get_reward())
-        )
+            assert reward <= 1, \
+                "Game is not over, but score is {}".format(reward)
+
+        openable = self.width * self.height - self.mines_count
+        won = opened == openable and not self._game_over()
+        if won and self.unnecessary_steps == 0:
+            assert np.isclose(reward, 1), \
+                "The game is won, and the score should be 1, " \
+                "but the score is {}".format(reward)
+
+        if not self.extended_actions:
+            # Flags change the board without opening cells.
+            assert (opened == 0) == (self.steps == 0), \
+                "{} cells are open after {} steps".format(opened, self.steps)
 
     def _is_done(self):
         openable = self.width * self.height - self.mines_count
-        opened = np.count_nonzero(self.open_cells)
-        all_opened = opened == openable
+        all_opened = self.opened_cells_count == openable
         return self._game_over() or all_opened
 
-
-COLORS = {
-    -2: [255, 0, 255],
-    -1: [128, 128, 128],
-    0: [255, 255, 255],
-    1: [0, 0, 255],
-    2: [0, 128, 0],
-    3: [255, 0, 0],
-    4: [0, 0, 128],
-    5: [128, 0, 0],
-    6: [0, 128, 128],
-    7: [255, 255, 0],
-    8: [255, 0, 255]
-}
@@ -0,0 +1,228 @@
+import multiprocessing as mp
+import traceback
+from multiprocessing import shared_memory
+
+import gym
+import gym.vector
+import numpy as np
+from gym.vector.utils import CloudpickleWrapper
+
+INFO_KEYS = ("opened cells", "steps", "unnecessary steps")
+
+
+class SharedMemoryVectorEnv(gym.vector.VectorEnv):
+    """
+    Runs environments like MinesweeperEnv in worker processes, where every
+    worker owns several of the environments.
+
+    Actions, observations, rewards and dones are exchanged through a single
+    shared memory block, so the pipes to the workers only carry short
+    commands. Only the numeric info entries listed in info_keys are sent back,
+    the rest of the info dict (like the mine locations) stays in the worker.
+    Environments that are done are reset automatically, and their last
+    observation is available in info["terminal observation"].
+    """
+
+    def __init__(self, env_fns, num_workers=None, info_keys=INFO_KEYS,
+                 copy=True, context=None):
+        dummy_env = env_fns[0]()
+        observation_space = dummy_env.observation_space
+        action_space = dummy_env.action_space
+        dummy_env.close()
+        super().__init__(len(env_fns), observation_space, action_space)
+
+        self.info_keys = tuple(info_keys)
+        self.copy = copy
+        self._layout = _buffer_layout(self.num_envs, observation_space,
+                                      len(self.info_keys))
+        size = sum(_buffer_size(shape, dtype)
+                   for _, shape, dtype in self._layout)
+        self._shared_memory = shared_memory.SharedMemory(create=True,
+                                                         size=size)
+        self._buffers = _buffer_views(self._shared_memory.buf, self._layout)
+
+        if num_workers is None:
+            num_workers = mp.cpu_count()
+        num_workers = max(1, min(num_workers, self.num_envs))
+        ctx = mp.get_context(context)
+
+        self._pipes = []
+        self._processes = []
+        for indices in np.array_split(np.arange(self.num_envs), num_workers):
+            parent_pipe, child_pipe = ctx.Pipe()
+            worker_env_fns = [CloudpickleWrapper(env_fns[i]) for i in indices]
+            process = ctx.Process(
+                target=_worker,
+                name="SharedMemoryVectorEnvWorker-{}".format(indices[0]),
+                args=(worker_env_fns, indices, self._shared_memory.name,
+                      self._layout, self.info_keys, child_pipe, parent_pipe),
+                daemon=True)
+            process.start()
+            child_pipe.close()
+            self._pipes.append(parent_pipe)
+            self._processes.append(process)
+
+    def reset_async(self):
+        self._send("reset")
+
+    def reset_wait(self, **kwargs):
+        self._receive()
+        return self._read(self._buffers["observations"])
+
+    def step_async(self, actions):
+        self._buffers["actions"][:] = actions
+        self._send("step")
+
+    def step_wait(self, **kwargs):
+        """
+        Returns
+        -------
+        observations, rewards, dones, info : tuple
+            observations (np.ndarray) :
+                Array of shape (num_envs, width, height).
+            rewards (np.ndarray) :
+                Float array of shape (num_envs,).
+            dones (np.ndarray) :
+                Bool array of shape (num_envs,).
+            info (dict) :
+                Maps every key in info_keys to an array with one entry per
+                environment, and "terminal observation" to the last
+                observations of the environments that are done.
+        """
+        self._receive()
+        info = {key: self._read(self._buffers["info"][:, i])
+                for i, key in enumerate(self.info_keys)}
+        info["terminal observation"] = self._read(
+            self._buffers["terminal observations"])
+        return (self._read(self._buffers["observations"]),
+                self._read(self._buffers["rewards"]),
+                self._read(self._buffers["dones"]),
+                info)
+
+    def get_stats(self):
+        """
+        The StepStats of all environments that were created with
+        profile=True, combined with StepStats.aggregate(), or None if there
+        are none.
+        """
+        from gym_minesweeper.profiling import StepStats
+        self._send("stats")
+        stats = [env_stats for message in self._receive()
+                 for env_stats in message if env_stats is not None]
+        return StepStats.aggregate(stats) if stats else None
+
+    def close_extras(self, terminate=False, **kwargs):
+        """
+        Stops the workers and frees the shared memory. Arrays that were
+        returned with copy=False can not be used after this.
+        """
+        if terminate:
+            for process in self._processes:
+                if process.is_alive():
+                    process.terminate()
+        else:
+            for pipe in self._pipes:
+                try:
+                    pipe.send("close")
+                    pipe.recv()
+                except (ConnectionError, EOFError):
+                    pass
+        for pipe in self._pipes:
+            pipe.close()
+        for process in self._processes:
+            process.join()
+
+        self._buffers = None
+        self._shared_memory.close()
+        self._shared_memory.unlink()
+
+    def _send(self, command):
+        for pipe in self._pipes:
+            pipe.send(command)
+
+    def _receive(self):
+        errors = []
+        messages = []
+        for pipe in self._pipes:
+            status, message = pipe.recv()
+            if status == "error":
+                errors.append(message)
+            messages.append(message)
+        if errors:
+            raise RuntimeError("A worker raised an exception:\n" + errors[0])
+        return messages
+
+    def _read(self, array):
+        return array.copy() if self.copy else array
+
+
+def _buffer_layout(num_envs, observation_space, info_count):
+    observation_shape = (num_envs,) + observation_space.shape
+    return [
+        ("observations", observation_shape, observation_space.dtype),
+        ("terminal observations", observation_shape, observation_space.dtype),
+        ("rewards", (num_envs,), np.dtype(np.float64)),
+        ("info", (num_envs, info_count), np.dtype(np.float64)),
+        ("actions", (num_envs,), np.dtype(np.int64)),
+        ("dones", (num_envs,), np.dtype(bool)),
+    ]
+
+
+def _buffer_size(shape, dtype):
+    return int(np.prod(shape)) * np.dtype(dtype).itemsize
+
+
+def _buffer_views(buffer, layout):
+    views = {}
+    offset = 0
+    for name, shape, dtype in layout:
+        views[name] = np.ndarray(shape, dtype=dtype, buffer=buffer,
+                                 offset=offset)
+        offset += _buffer_size(shape, dtype)
+    return views
+
+
+def _worker(env_fns, indices, shared_memory_name, layout, info_keys, pipe,
+            parent_pipe):
+    parent_pipe.close()
+    envs = [env_fn() for env_fn in env_fns]
+    memory = shared_memory.SharedMemory(name=shared_memory_name)
+    buffers = _buffer_views(memory.buf, layout)
+    observations = buffers["observations"]
+    try:
+        while True:
+            command = pipe.recv()
+            if command == "reset":
+                for i, env in zip(indices, envs):
+                    observations[i] = env.reset()
+            elif command == "step":
+                for i, env in zip(indices, envs):
+                    observation, reward, done, info = env.step(
+                        buffers["actions"][i])
+                    for k, key in enumerate(info_keys):
+                        buffers["info"][i, k] = info[key]
+                    if done:
+                        buffers["terminal observations"][i] = observation
+                        observation = env.reset()
+                    observations[i] = observation
+                    buffers["rewards"][i] = reward
+                    buffers["dones"][i] = done
+            elif command == "stats":
+                stats = [getattr(env.unwrapped, "stats", None) for env in envs]
+                pipe.send(("ok", [None if env_stats is None
+                                  else env_stats.as_dict()
+                                  for env_stats in stats]))
+                continue
+            elif command == "close":
+                pipe.send(("ok", None))
+                break
+            pipe.send(("ok", None))
+    except (KeyboardInterrupt, EOFError):
+        pass
+    except Exception:
+        pipe.send(("error", traceback.format_exc()))
+    finally:
+        del observations, buffers
+        memory.close()
+        for env in envs:
+            env.close()
@@ -0,0 +1,272 @@
+import gym
+import gym.vector
+import numpy as np
+
+from gym_minesweeper.envs.board import (dilate, episode_rng,
+                                         label_zero_regions,
+                                         neighbor_mine_counts, place_mines,
+                                         safe_cells)
+from gym_minesweeper.envs.minesweeper_env import INFO_LEVELS
+from gym_minesweeper.rendering import RgbRenderer
+
+
+class VectorMinesweeperEnv(gym.vector.VectorEnv):
+    """
+    Plays num_envs games of minesweeper at once, storing all boards as
+    stacked arrays of shape (num_envs, width, height).
+
+    The rules, rewards and observations of every board are the same as in
+    MinesweeperEnv. Boards that are done are reset automatically at the end of
+    step(), in which case the returned observation is the first observation of
+    the new game, and the last observation of the finished game is available
+    in info["terminal observation"].
+    """
+    metadata = {'render.modes': ["rgb_array"]}
+    reward_range = (-float(1), float(1))
+
+    def __init__(self, num_envs=16, width=8, height=8, mine_count=10,
+                 flood_fill=True, punishment=0.01, seed=None,
+                 first_move_safe=True, compact=False, info_level="full",
+                 first_move_opening=False, render_zoom=20):
+        if info_level not in INFO_LEVELS:
+            raise ValueError("info_level must be one of {}, not {!r}".format(
+                INFO_LEVELS, info_level))
+        self.width = width
+        self.height = height
+        self.mines_count = mine_count
+        self.flood_fill = flood_fill
+        self.punishment = punishment
+        self.first_move_safe = first_move_safe
+        self.first_move_opening = first_move_opening
+        self.compact = compact
+        self.observation_dtype = np.int8 if compact else np.float32
+        self.info_level = info_level
+        self.rgb_renderer = RgbRenderer(zoom=render_zoom)
+
+        observation_space = gym.spaces.Box(low=-2, high=8,
+                                           shape=(self.width, self.height),
+                                           dtype=self.observation_dtype)
+        action_space = gym.spaces.Discrete(self.width * self.height)
+        super().__init__(num_envs, observation_space, action_space)
+
+        shape = (num_envs, self.width, self.height)
+        self.mines = np.zeros(shape, dtype=bool)
+        self.open_cells = np.zeros(shape, dtype=bool)
+        self.neighbor_mines = np.zeros(shape, dtype=np.int8)
+        self.zero_regions = np.full(shape, -1)
+        self.steps = np.zeros(num_envs, dtype=int)
+        self.unnecessary_steps = np.zeros(num_envs, dtype=int)
+        self.opened_cells_count = np.zeros(num_envs, dtype=int)
+        self.mine_opened = np.zeros(num_envs, dtype=bool)
+        self.episodes = np.zeros(num_envs, dtype=int)
+
+        self._actions = None
+        self.seed(seed)
+        self._reset_boards(np.arange(num_envs))
+
+    def seed(self, seeds=None):
+        """
+        Seed the generators of all boards. If seeds is a list, it holds one
+        seed per board. Otherwise the generators of the boards are spawned
+        from this single seed. Like in MinesweeperEnv, the next reset starts
+        episode 0 of every board, and the mine layout of an episode only
+        depends on the seed, the board index and the episode index.
+        """
+        if isinstance(seeds, (list, tuple, np.ndarray)):
+            self._seed_sequences = [np.random.SeedSequence(seed)
+                                    for seed in seeds]
+        else:
+            self._seed_sequences = np.random.SeedSequence(seeds).spawn(
+                self.num_envs)
+        self.episodes[:] = -1
+        # Boards that are stepped before the next reset place their mines
+        # with the generator of episode 0.
+        self._rngs = [episode_rng(seed_sequence, 0)
+                      for seed_sequence in self._seed_sequences]
+        return [seed_sequence.entropy
+                for seed_sequence in self._seed_sequences]
+
+    def reset_wait(self, **kwargs):
+        self._reset_boards(np.arange(self.num_envs))
+        return self._get_observation()
+
+    def step_async(self, actions):
+        actions = np.asarray(actions, dtype=int)
+        cell_count = self.width * self.height
+        # Negative actions would wrap around in the indexing of the boards.
+        invalid = np.logical_or(actions < 0, actions >= cell_count)
+        if invalid.any():
+            raise ValueError("action must be in [0, {}), not {}".format(
+                cell_count, actions[invalid][0]))
+        self._actions = actions
+
+    def step_wait(self, **kwargs):
+        """
+        Dig one cell on every board. See MinesweeperEnv.step for the meaning
+        of the actions, observations and rewards.
+
+        Returns
+        -------
+        observations, rewards, dones, info : tuple
+            observations (np.ndarray) :
+                Array of shape (num_envs, width, height).
+            rewards (np.ndarray) :
+                Float array of shape (num_envs,).
+            dones (np.ndarray) :
+                Bool array of shape (num_envs,).
+            info (dict) :
+                The same keys as MinesweeperEnv's info for the chosen
+                info_level, but every value is an array with one entry per
+                board. Always includes "terminal observation", the
+                observations before the finished boards were reset.
+                The action mask is that of the returned observations, so
+                every action is legal on the boards that were reset.
+        """
+        actions = self._actions
+        boards = np.arange(self.num_envs)
+        x, y = self._parse_action(actions)
+
+        if self.first_move_safe:
+            fresh = np.flatnonzero(self.steps == 0)
+            if fresh.size:
+                self._generate_mines(fresh, first_moves=(x[fresh], y[fresh]))
+
+        self.steps += 1
+        self._open_cells(x, y)
+
+        observations = self._get_observation()
+        rewards = self._get_reward()
+        dones = self._is_done()
+        info = self._get_info(x, y)
+        info["terminal observation"] = observations.copy()
+
+        finished = np.flatnonzero(dones)
+        if finished.size:
+            self._reset_boards(finished)
+            observations[finished] = -1
+            if "action mask" in info:
+                info["action mask"][finished] = True
+
+        return observations, rewards, dones, info
+
+    def render(self, mode="rgb_array"):
+        """
+        Render all boards as one array of shape
+        (num_envs, width * zoom, height * zoom, 3), which is overwritten by
+        the next render.
+        """
+        if mode != "rgb_array":
+            raise ValueError("VectorMinesweeperEnv can only render "
+                             "rgb_array, not {!r}".format(mode))
+        return self.rgb_renderer.render(self._get_observation())
+
+    def close_extras(self, **kwargs):
+        pass
+
+    def legal_actions(self):
+        """
+        A boolean array of shape (num_envs, width * height) that is True for
+        every action that digs a closed cell.
+        """
+        return np.logical_not(self.open_cells).transpose(0, 2, 1).reshape(
+            self.num_envs, -1)
+
+    def _parse_action(self, action):
+        x = action % self.width
+        y = action // self.width
+        return x, y
+
+    def _reset_boards(self, boards):
+        self.episodes[boards] += 1
+        for board in boards:
+            self._rngs[board] = episode_rng(self._seed_sequences[board],
+                                            self.episodes[board])
+        self.open_cells[boards] = False
+        self.steps[boards] = 0
+        self.unnecessary_steps[boards] = 0
+        self.opened_cells_count[boards] = 0
+        self.mine_opened[boards] = False
+        if self.first_move_safe:
+            # The mines are placed on the first step of every board, away
+            # from the first cell that is dug.
+            self.mines[boards] = False
+            self.neighbor_mines[boards] = 0
+        else:
+            self._generate_mines(boards)
+
+    def _generate_mines(self, boards, first_moves=None):
+        cell_count = self.width * self.height
+        if first_moves is None:
+            excluded = [None] * boards.size
+        else:
+            excluded = [safe_cells(x, y, self.width, self.height,
+                                   self.mines_count, self.first_move_opening)
+                        for x, y in zip(*first_moves)]
+
+        mines = np.stack([
+            place_mines(self._rngs[board], cell_count, self.mines_count,
+                        excluded_cells)
+            for board, excluded_cells in zip(boards, excluded)])
+        mines = mines.reshape(boards.size, self.width, self.height)
+
+        self.mines[boards] = mines
+        self.neighbor_mines[boards] = neighbor_mine_counts(mines)
+        self.zero_regions[boards] = label_zero_regions(
+            self.neighbor_mines[boards])
+
+    def _open_cells(self, x, y):
+        boards = np.arange(self.num_envs)
+        already_open = self.open_cells[boards, x, y]
+        self.unnecessary_steps += already_open
+
+        closed = np.logical_not(already_open)
+        flooding = np.logical_and(closed,
+                                  self.neighbor_mines[boards, x, y] == 0)
+        if not self.flood_fill:
+            flooding[:] = False
+        single = np.logical_and(closed, np.logical_not(flooding))
+
+        revealed = np.zeros(self.open_cells.shape, dtype=bool)
+        revealed[boards[single], x[single], y[single]] = True
+        flooded = np.flatnonzero(flooding)
+        if flooded.size:
+            labels = self.zero_regions[flooded, x[flooded], y[flooded]]
+            regions = self.zero_regions[flooded] == labels[:, None, None]
+            revealed[flooded] = dilate(regions)
+
+        revealed &= np.logical_not(self.open_cells)
+        self.open_cells |= revealed
+        self.opened_cells_count += revealed.sum(axis=(1, 2))
+        self.mine_opened |= np.logical_and(single, self.mines[boards, x, y])
+
+    def _get_observation(self):
+        observation = np.where(self.open_cells, self.neighbor_mines, -1)
+        observation[np.logical_and(self.open_cells, self.mines)] = -2
+        return observation.astype(self.observation_dtype)
+
+    def _get_reward(self):
+        openable = self.width * self.height - self.mines_count
+        punishment = self.unnecessary_steps * self.punishment
+        open_cells_reward = (self.opened_cells_count - punishment) / openable
+        return (open_cells_reward - self.mine_opened -
+                self.mine_opened / openable)
+
+    def _is_done(self):
+        openable = self.width * self.height - self.mines_count
+        all_opened = self.opened_cells_count == openable
+        return np.logical_or(self.mine_opened, all_opened)
+
+    def _get_info(self, x, y):
+        if self.info_level == "none":
+            return {}
+        info = {
+            "opened cells": self.opened_cells_count.copy(),
+            "steps": self.steps.copy(),
+            "unnecessary steps": self.unnecessary_steps.copy(),
+            "game over": self.mine_opened.copy(),
+            "opened cell": np.stack([x, y], axis=1),
+            "action mask": self.legal_actions()
+        }
+        if self.info_level == "full":
+            info["mine locations"] = self.mines.astype(int)
+        return info
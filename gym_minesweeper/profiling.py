@@ -0,0 +1,165 @@
+"""
+Opt-in instrumentation of the work done in MinesweeperEnv.
+
+Create the env with profile=True to collect a StepStats in env.stats, or
+profile="allocations" to also measure the memory allocated by every step
+with tracemalloc, which slows down the whole process. Without profile, the
+env only checks once per step whether it should collect stats.
+
+tracemalloc.reset_peak() only exists since Python 3.9. On older versions,
+the growth of the traced memory over a step is recorded instead of its
+peak.
+"""
+import json
+import time
+import tracemalloc
+
+clock = time.perf_counter
+_RESET_PEAK = hasattr(tracemalloc, "reset_peak")
+
+PHASES = ("reset", "checks", "mines", "action", "observation", "reward",
+          "done", "info", "invariants")
+
+
+class Summary:
+    """The count, total and maximum of a series of values."""
+    __slots__ = ["count", "total", "maximum"]
+
+    def __init__(self, count=0, total=0, maximum=0):
+        self.count = count
+        self.total = total
+        self.maximum = maximum
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        if value > self.maximum:
+            self.maximum = value
+
+    def merge(self, other):
+        self.count += other.count
+        self.total += other.total
+        self.maximum = max(self.maximum, other.maximum)
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0,
+            "max": self.maximum,
+        }
+
+
+class StepStats:
+    """
+    Statistics of the steps and resets of one or more envs.
+
+    Attributes
+    ----------
+    phases (dict) :
+        Maps the name of every phase of step() and reset() (see PHASES) to a
+        Summary of its wall time in seconds.
+    cells_revealed (Summary) :
+        The amount of cells opened by every step.
+    region_sizes (Summary) :
+        The amount of cells in every flood fill region that was opened,
+        including cells that were already open.
+    allocated_bytes (Summary) :
+        The peak amount of memory allocated during every step, if
+        allocations are traced (the growth before Python 3.9).
+    """
+
+    def __init__(self, trace_allocations=False):
+        self.trace_allocations = trace_allocations
+        self.phases = {phase: Summary() for phase in PHASES}
+        self.cells_revealed = Summary()
+        self.region_sizes = Summary()
+        self.allocated_bytes = Summary()
+        if trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def add_phase(self, phase, seconds):
+        self.phases[phase].add(seconds)
+
+    def start_step(self):
+        if self.trace_allocations:
+            if _RESET_PEAK:
+                tracemalloc.reset_peak()
+            self._traced_before = tracemalloc.get_traced_memory()[0]
+
+    def end_step(self, cells_revealed):
+        self.cells_revealed.add(cells_revealed)
+        if self.trace_allocations:
+            current, peak = tracemalloc.get_traced_memory()
+            if not _RESET_PEAK:
+                # The peak is that of the whole trace.
+                peak = max(current, self._traced_before)
+            self.allocated_bytes.add(peak - self._traced_before)
+
+    def merge(self, other):
+        """Add the stats of other to these."""
+        for phase, summary in other.phases.items():
+            self.phases.setdefault(phase, Summary()).merge(summary)
+        self.cells_revealed.merge(other.cells_revealed)
+        self.region_sizes.merge(other.region_sizes)
+        self.allocated_bytes.merge(other.allocated_bytes)
+
+    @classmethod
+    def aggregate(cls, stats):
+        """
+        Combine the stats of several envs, for example the envs of a vector
+        env, into one. Accepts StepStats objects and their as_dict().
+        """
+        total = cls()
+        for env_stats in stats:
+            if isinstance(env_stats, dict):
+                env_stats = cls.from_dict(env_stats)
+            total.merge(env_stats)
+        return total
+
+    def as_dict(self):
+        """
+        The stats as a dict of plain numbers, with the count, total, mean
+        and max of every series.
+        """
+        return {
+            "steps": self.cells_revealed.count,
+            "phases": {phase: summary.as_dict()
+                       for phase, summary in self.phases.items()},
+            "cells revealed": self.cells_revealed.as_dict(),
+            "region sizes": self.region_sizes.as_dict(),
+            "allocated bytes": self.allocated_bytes.as_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        def summary(values):
+            return Summary(values["count"], values["total"], values["max"])
+
+        stats = cls()
+        stats.phases = {phase: summary(values)
+                        for phase, values in data["phases"].items()}
+        stats.cells_revealed = summary(data["cells revealed"])
+        stats.region_sizes = summary(data["region sizes"])
+        stats.allocated_bytes = summary(data["allocated bytes"])
+        return stats
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.as_dict(), **kwargs)
+
+
+class PhaseTimer:
+    """
+    Times consecutive phases: lap(phase) adds the time since the previous
+    lap, or since the timer was created, to that phase of stats.
+    """
+    __slots__ = ["stats", "start"]
+
+    def __init__(self, stats):
+        self.stats = stats
+        self.start = clock()
+
+    def lap(self, phase):
+        now = clock()
+        self.stats.phases[phase].add(now - self.start)
+        self.start = now
@@ -0,0 +1,67 @@
+import numpy as np
+
+COLORS = {
+    -3: [255, 128, 0],
+    -2: [255, 0, 255],
+    -1: [128, 128, 128],
+    0: [255, 255, 255],
+    1: [0, 0, 255],
+    2: [0, 128, 0],
+    3: [255, 0, 0],
+    4: [0, 0, 128],
+    5: [128, 0, 0],
+    6: [0, 128, 128],
+    7: [255, 255, 0],
+    8: [255, 0, 255]
+}
+
+# The color of observation value v is PALETTE[v - PALETTE_OFFSET].
+PALETTE_OFFSET = min(COLORS)
+PALETTE = np.array([COLORS[value] for value in sorted(COLORS)],
+                   dtype=np.uint8)
+
+
+def render_rgb(observations, zoom=20, out=None):
+    """
+    Convert one observation of shape (width, height), or a stack of them of
+    shape (..., width, height), to an RGB image of shape
+    (..., width * zoom, height * zoom, 3), where every cell is a zoom x zoom
+    square.
+
+    If out is given, the image is written into it instead of allocating a
+    new array.
+    """
+    observations = np.asarray(observations)
+    colors = PALETTE[observations.astype(np.intp) - PALETTE_OFFSET]
+    width, height = observations.shape[-2:]
+    shape = observations.shape[:-2] + (width * zoom, height * zoom, 3)
+    if out is None:
+        out = np.empty(shape, dtype=np.uint8)
+    elif out.shape != shape or not out.flags.c_contiguous:
+        raise ValueError("out must be a contiguous array of shape {}"
+                         .format(shape))
+
+    blocks = out.reshape(observations.shape[:-2] +
+                         (width, zoom, height, zoom, 3))
+    blocks[...] = colors[..., :, None, :, None, :]
+    return out
+
+
+class RgbRenderer:
+    """
+    Renders observations with render_rgb into a buffer that is allocated once
+    and reused, so the returned image is overwritten by the next call.
+    """
+
+    def __init__(self, zoom=20):
+        self.zoom = zoom
+        self._buffer = None
+
+    def render(self, observations):
+        observations = np.asarray(observations)
+        width, height = observations.shape[-2:]
+        shape = observations.shape[:-2] + (width * self.zoom,
+                                           height * self.zoom, 3)
+        if self._buffer is None or self._buffer.shape != shape:
+            self._buffer = np.empty(shape, dtype=np.uint8)
+        return render_rgb(observations, self.zoom, out=self._buffer)
@@ -0,0 +1,319 @@
+"""
+Serve minesweeper games to remote agents over TCP or a Unix socket.
+
+Every connection owns its own envs, which are created by the server with
+env_fn. Messages start with a header of the message kind, a request id and
+the size of the payload, followed by the payload:
+
+    CREATE  count                   -> first env id, width, height
+    RESET   n, env ids              -> observations
+    STEP    n, env ids, actions     -> observations, rewards, dones
+
+Env ids are uint32, actions int32, observations int8 of shape
+(n, width, height), rewards float32 and dones uint8. The server answers
+every request with a message of the same kind and request id, or with an
+ERROR message holding the error as utf-8 text. Envs are not reset
+automatically when they are done.
+
+A client may send many requests without waiting for the answers. The
+server handles the requests of a connection in order, and stops reading
+new ones while the client does not read the answers, so a slow client can
+not make the server buffer an unbounded amount of observations.
+
+Run a server with
+
+    python -m gym_minesweeper.server --port 7000 --env-kwargs '{"width": 16}'
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import struct
+import sys
+
+import numpy as np
+
+CREATE, RESET, STEP, ERROR = 1, 2, 3, 255
+# kind, request id and payload size.
+HEADER = struct.Struct("<BII")
+COUNT = struct.Struct("<I")
+CREATED = struct.Struct("<III")
+
+
+class MinesweeperServer:
+    """
+    Hosts MinesweeperEnv instances for the clients that connect to it.
+
+    Parameters
+    ----------
+    env_fn (callable) :
+        Creates one env. Defaults to MinesweeperEnv(**env_kwargs). All envs
+        must have the same board size.
+    max_envs (int) :
+        The largest amount of envs that one connection may create.
+    """
+
+    def __init__(self, env_fn=None, max_envs=100000, **env_kwargs):
+        if env_fn is None:
+            from gym_minesweeper.envs import MinesweeperEnv
+
+            def env_fn():
+                return MinesweeperEnv(**env_kwargs)
+        self.env_fn = env_fn
+        self.max_envs = max_envs
+        self._server = None
+
+    async def start(self, host="127.0.0.1", port=0, path=None):
+        """
+        Start listening on host and port, or on the Unix socket at path if
+        it is given. Port 0 picks a free port, see self.port.
+        """
+        if path is None:
+            self._server = await asyncio.start_server(self._serve, host, port)
+        else:
+            self._server = await asyncio.start_unix_server(self._serve, path)
+        return self
+
+    @property
+    def port(self):
+        return self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _serve(self, reader, writer):
+        connection = _Connection(self)
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(HEADER.size)
+                except asyncio.IncompleteReadError:
+                    break
+                kind, request_id, size = HEADER.unpack(header)
+                payload = await reader.readexactly(size)
+                try:
+                    kind, response = connection.handle(kind, payload)
+                except Exception as error:
+                    kind, response = ERROR, "{}: {}".format(
+                        type(error).__name__, error).encode()
+                writer.write(HEADER.pack(kind, request_id, len(response)))
+                writer.write(response)
+                # Wait until the client reads the answers before reading
+                # more requests.
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            connection.close()
+            writer.close()
+
+
+class _Connection:
+    """The envs of one client."""
+
+    def __init__(self, server):
+        self.server = server
+        self.envs = []
+        self.width = None
+        self.height = None
+
+    def handle(self, kind, payload):
+        if kind == CREATE:
+            return CREATE, self.create(*COUNT.unpack(payload))
+        elif kind == RESET:
+            return RESET, self.reset(_read_ids(payload)[0])
+        elif kind == STEP:
+            ids, offset = _read_ids(payload)
+            actions = np.frombuffer(payload, dtype="<i4", count=ids.size,
+                                    offset=offset)
+            return STEP, self.step(ids, actions)
+        raise ValueError("Unknown message kind {}".format(kind))
+
+    def create(self, count):
+        if len(self.envs) + count > self.server.max_envs:
+            raise ValueError("A connection may create at most {} envs"
+                             .format(self.server.max_envs))
+        first_id = len(self.envs)
+        for _ in range(count):
+            env = self.server.env_fn()
+            board = env.unwrapped
+            if self.width is None:
+                self.width, self.height = board.width, board.height
+            elif (board.width, board.height) != (self.width, self.height):
+                raise ValueError("All envs must have the same board size")
+            self.envs.append(env)
+        return CREATED.pack(first_id, self.width or 0, self.height or 0)
+
+    def reset(self, ids):
+        envs = self._get_envs(ids)
+        observations = np.empty((ids.size, self.width, self.height),
+                                dtype=np.int8)
+        for i, env in enumerate(envs):
+            observations[i] = env.reset()
+        return observations.tobytes()
+
+    def step(self, ids, actions):
+        envs = self._get_envs(ids)
+        observations = np.empty((ids.size, self.width, self.height),
+                                dtype=np.int8)
+        rewards = np.empty(ids.size, dtype="<f4")
+        dones = np.empty(ids.size, dtype=np.uint8)
+        for i, (env, action) in enumerate(zip(envs, actions)):
+            observations[i], rewards[i], dones[i], _ = env.step(int(action))
+        return b"".join([observations.tobytes(), rewards.tobytes(),
+                         dones.tobytes()])
+
+    def close(self):
+        for env in self.envs:
+            env.close()
+        self.envs = []
+
+    def _get_envs(self, ids):
+        if ids.size and ids.max() >= len(self.envs):
+            raise IndexError("Env {} does not exist".format(ids.max()))
+        return [self.envs[i] for i in ids]
+
+
+def _read_ids(payload):
+    count, = COUNT.unpack_from(payload)
+    ids = np.frombuffer(payload, dtype="<u4", count=count, offset=COUNT.size)
+    return ids, COUNT.size + 4 * count
+
+
+class MinesweeperClient:
+    """
+    Plays games on a MinesweeperServer. Requests can be sent concurrently,
+    for example with asyncio.gather(), and are pipelined over the single
+    connection. At most max_in_flight requests are sent before their
+    answers arrive.
+    """
+
+    def __init__(self, reader, writer, max_in_flight=64):
+        self._reader = reader
+        self._writer = writer
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._pending = {}
+        self._request_ids = itertools.count()
+        self._receiver = asyncio.ensure_future(self._receive())
+        self.width = None
+        self.height = None
+
+    @classmethod
+    async def connect(cls, host="127.0.0.1", port=None, path=None,
+                      max_in_flight=64):
+        if path is None:
+            reader, writer = await asyncio.open_connection(host, port)
+        else:
+            reader, writer = await asyncio.open_unix_connection(path)
+        return cls(reader, writer, max_in_flight)
+
+    async def create(self, count):
+        """Create count envs, and return their ids."""
+        payload = await self._request(CREATE, COUNT.pack(count))
+        first_id, self.width, self.height = CREATED.unpack(payload)
+        return np.arange(first_id, first_id + count)
+
+    async def reset(self, ids):
+        """Reset the envs with the given ids, and return their observations."""
+        ids = np.asarray(ids, dtype="<u4")
+        payload = await self._request(
+            RESET, COUNT.pack(ids.size) + ids.tobytes())
+        return np.frombuffer(payload, dtype=np.int8).reshape(
+            ids.size, self.width, self.height)
+
+    async def step(self, ids, actions):
+        """
+        Take one action in each of the envs with the given ids.
+
+        Returns
+        -------
+        observations, rewards, dones : tuple
+            Arrays with one entry per env, like the return value of
+            VectorMinesweeperEnv.step() without the info.
+        """
+        ids = np.asarray(ids, dtype="<u4")
+        actions = np.asarray(actions, dtype="<i4")
+        payload = await self._request(
+            STEP, COUNT.pack(ids.size) + ids.tobytes() + actions.tobytes())
+        cells = ids.size * self.width * self.height
+        observations = np.frombuffer(payload, dtype=np.int8, count=cells)
+        rewards = np.frombuffer(payload, dtype="<f4", count=ids.size,
+                                offset=cells)
+        dones = np.frombuffer(payload, dtype=np.uint8, count=ids.size,
+                              offset=cells + 4 * ids.size)
+        return (observations.reshape(ids.size, self.width, self.height),
+                rewards, dones.astype(bool))
+
+    async def close(self):
+        self._writer.close()
+        await self._writer.wait_closed()
+        self._receiver.cancel()
+
+    async def _request(self, kind, payload):
+        async with self._slots:
+            if self._receiver.done():
+                raise ConnectionError("The connection to the server was "
+                                      "closed")
+            request_id = next(self._request_ids) % 2 ** 32
+            future = asyncio.get_event_loop().create_future()
+            self._pending[request_id] = future
+            self._writer.write(HEADER.pack(kind, request_id, len(payload)))
+            self._writer.write(payload)
+            await self._writer.drain()
+            return await future
+
+    async def _receive(self):
+        error = ConnectionError("The connection to the server was closed")
+        try:
+            while True:
+                kind, request_id, size = HEADER.unpack(
+                    await self._reader.readexactly(HEADER.size))
+                payload = await self._reader.readexactly(size)
+                future = self._pending.pop(request_id, None)
+                if future is None or future.done():
+                    # The request was cancelled, for example by a timeout.
+                    continue
+                if kind == ERROR:
+                    future.set_exception(RuntimeError(
+                        "The server raised an exception: " +
+                        payload.decode()))
+                else:
+                    future.set_result(payload)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except Exception as exception:
+            error = ConnectionError("Reading from the server failed: {}: {}"
+                                    .format(type(exception).__name__,
+                                            exception))
+        finally:
+            # No answers arrive anymore, so fail the requests that wait.
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            self._pending.clear()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split(
+        "\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7000)
+    parser.add_argument("--path", help="Listen on this Unix socket instead")
+    parser.add_argument("--env-kwargs", default="{}",
+                        help="Arguments of MinesweeperEnv, as JSON")
+    args = parser.parse_args(argv)
+
+    async def serve():
+        server = MinesweeperServer(**json.loads(args.env_kwargs))
+        await server.start(args.host, args.port, args.path)
+        await server.serve_forever()
+
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
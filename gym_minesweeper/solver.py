@@ -0,0 +1,339 @@
+"""
+Deduce what an observation reveals about the closed cells.
+
+known_cells() finds the closed cells that are provably safe or provably
+mines, and mine_probabilities() computes the probability that each cell is a
+mine, given that every mine layout that agrees with the observation is
+equally likely.
+"""
+import functools
+import math
+
+import numpy as np
+
+from gym_minesweeper.envs.board import NEIGHBORS, dilate, neighbor_mine_counts
+
+
+def known_cells(observation):
+    """
+    Find the closed cells that are certainly safe or certainly mines.
+
+    Repeats two rules until neither finds anything new: a number whose
+    neighboring mines are all known makes its other closed neighbors safe,
+    and a number with as many closed neighbors as missing mines makes them
+    all mines. Then the same is done for pairs of overlapping numbers, where
+    the difference of their missing mines is forced into the cells they do
+    not share.
+
+    Parameters
+    ----------
+    observation (np.ndarray) :
+        An observation of shape (width, height) from MinesweeperEnv.
+
+    Returns
+    -------
+    safe, mines : tuple
+        Boolean arrays of shape (width, height) marking the closed cells
+        that are known to be safe and known to be mines. Opened mines are
+        included in mines.
+    """
+    observation = np.asarray(observation)
+    # Flagged cells (-3) are closed cells that may or may not be mines.
+    closed = np.logical_or(observation == -1, observation == -3)
+    numbers = observation >= 0
+    safe = np.zeros(observation.shape, dtype=bool)
+    mines = observation == -2
+
+    while True:
+        found = _single_point(observation, closed, numbers, safe, mines)
+        if not found:
+            constraints = _constraints(observation, closed, numbers, safe,
+                                       mines)
+            found = _subsets(constraints, safe, mines)
+        if not found:
+            return safe, mines
+
+
+def mine_probabilities(observation, mine_count, max_component_size=48):
+    """
+    The probability of every cell being a mine.
+
+    Closed cells next to a number (the frontier) are split into components
+    that share no numbers, and every component's mine layouts are counted
+    exactly, reusing the counts of components that were seen before. The
+    components are then combined with the amount of ways to place the rest of
+    the mine_count mines in the closed cells away from the frontier.
+    Components with more than max_component_size cells are approximated.
+
+    Returns
+    -------
+    probabilities (np.ndarray) :
+        A float array of shape (width, height). Opened cells are 0, except
+        opened mines, which are 1.
+    """
+    observation = np.asarray(observation)
+    closed = np.logical_or(observation == -1, observation == -3)
+    numbers = observation >= 0
+    safe, mines = known_cells(observation)
+    probabilities = mines.astype(float)
+
+    constraints = _constraints(observation, closed, numbers, safe, mines)
+    components = _components(constraints)
+    unknown = np.logical_and(closed, np.logical_not(np.logical_or(safe,
+                                                                  mines)))
+    frontier = set()
+    for cells, _ in components:
+        frontier.update(cells)
+    rest = int(np.count_nonzero(unknown)) - len(frontier)
+    missing = int(mine_count - np.count_nonzero(mines))
+
+    # For every component, the amount of layouts with m mines, and for every
+    # cell in it, the amount of those layouts where it is a mine.
+    layouts = []
+    for cells, component_constraints in components:
+        if len(cells) <= max_component_size:
+            layouts.append(_count_layouts(component_constraints))
+        else:
+            layouts.append(_approximate_layouts(len(cells),
+                                                component_constraints))
+
+    for index, (cells, _) in enumerate(components):
+        others = [1]
+        for other_index, (counts, _) in enumerate(layouts):
+            if other_index != index:
+                others = _convolve(others, counts)
+        counts, cell_counts = layouts[index]
+        # The weight of the layouts of this component with m mines is the
+        # amount of ways to complete them on the rest of the board.
+        weights = [sum(other * _combinations(rest, missing - m - k)
+                       for k, other in enumerate(others))
+                   for m in range(len(counts))]
+        total = sum(count * weight for count, weight in zip(counts, weights))
+        if total == 0:
+            continue
+        for position, cell in enumerate(cells):
+            mine_weight = sum(cell_counts[m][position] * weights[m]
+                              for m in range(len(counts)))
+            probabilities.flat[cell] = mine_weight / total
+
+    if rest:
+        frontier_counts = [1]
+        for counts, _ in layouts:
+            frontier_counts = _convolve(frontier_counts, counts)
+        weights = [count * _combinations(rest, missing - k)
+                   for k, count in enumerate(frontier_counts)]
+        total = sum(weights)
+        if total:
+            expected = sum(weight * (missing - k)
+                           for k, weight in enumerate(weights)) / total
+            rest_cells = unknown.copy()
+            rest_cells.flat[list(frontier)] = False
+            probabilities[rest_cells] = expected / rest
+
+    return probabilities
+
+
+def _single_point(observation, closed, numbers, safe, mines):
+    unknown = np.logical_and(closed, np.logical_not(np.logical_or(safe,
+                                                                  mines)))
+    missing = observation - neighbor_mine_counts(mines)
+    unknown_around = neighbor_mine_counts(unknown)
+    active = np.logical_and(numbers, unknown_around > 0)
+
+    new_safe = np.logical_and(
+        dilate(np.logical_and(active, missing == 0)), unknown)
+    new_mines = np.logical_and(
+        dilate(np.logical_and(active, missing == unknown_around)), unknown)
+    safe |= new_safe
+    mines |= new_mines
+    return bool(new_safe.any() or new_mines.any())
+
+
+def _constraints(observation, closed, numbers, safe, mines):
+    """
+    A list of (cells, missing mines) for every number next to an unknown
+    cell, where cells is a frozenset of flat indices of the unknown cells.
+    """
+    width, height = observation.shape
+    unknown = np.logical_and(closed, np.logical_not(np.logical_or(safe,
+                                                                  mines)))
+    missing = observation - neighbor_mine_counts(mines)
+    active = np.logical_and(numbers, dilate(unknown))
+
+    constraints = []
+    for x, y in np.argwhere(active):
+        cells = frozenset(
+            (x + dx) * height + y + dy for dx, dy in NEIGHBORS
+            if 0 <= x + dx < width and 0 <= y + dy < height and
+            unknown[x + dx, y + dy])
+        constraints.append((cells, int(missing[x, y])))
+    return constraints
+
+
+def _subsets(constraints, safe, mines):
+    by_cell = {}
+    for index, (cells, _) in enumerate(constraints):
+        for cell in cells:
+            by_cell.setdefault(cell, []).append(index)
+
+    found = False
+    for a, (cells_a, missing_a) in enumerate(constraints):
+        overlapping = {b for cell in cells_a for b in by_cell[cell]}
+        for b in overlapping:
+            cells_b, missing_b = constraints[b]
+            only_b = cells_b - cells_a
+            # At most missing_a mines can be in the shared cells, so at least
+            # missing_b - missing_a mines are in the cells only b has.
+            if only_b and missing_b - missing_a == len(only_b):
+                for cell in only_b:
+                    mines.flat[cell] = True
+                for cell in cells_a - cells_b:
+                    safe.flat[cell] = True
+                found = True
+            elif only_b and cells_a <= cells_b and missing_a == missing_b:
+                for cell in only_b:
+                    safe.flat[cell] = True
+                found = True
+    return found
+
+
+def _components(constraints):
+    """
+    Split the constraints into groups that share no cells. Returns a list of
+    (cells, constraints), where cells is a sorted list of flat indices and
+    the constraints are tuples of (positions in cells, missing mines).
+    """
+    parent = {}
+
+    def find(cell):
+        while parent[cell] != cell:
+            parent[cell] = parent[parent[cell]]
+            cell = parent[cell]
+        return cell
+
+    for cells, _ in constraints:
+        for cell in cells:
+            parent.setdefault(cell, cell)
+        first = find(min(cells))
+        for cell in cells:
+            parent[find(cell)] = first
+
+    groups = {}
+    for cells, missing in constraints:
+        groups.setdefault(find(min(cells)), []).append((cells, missing))
+
+    components = []
+    for group in groups.values():
+        cells = sorted(set().union(*[cells for cells, _ in group]))
+        positions = {cell: position for position, cell in enumerate(cells)}
+        component_constraints = tuple(sorted(
+            (tuple(sorted(positions[cell] for cell in group_cells)), missing)
+            for group_cells, missing in group))
+        components.append((cells, component_constraints))
+    return components
+
+
+@functools.lru_cache(maxsize=4096)
+def _count_layouts(constraints):
+    """
+    Count the mine layouts of a component that satisfy all its constraints.
+
+    Cells are assigned in order, and the amount of ways to assign the
+    remaining cells only depends on the missing mines of the constraints
+    that have both assigned and unassigned cells, so those partial results
+    are memoized.
+
+    Returns
+    -------
+    counts, cell_counts : tuple
+        counts[m] is the amount of layouts with m mines, and
+        cell_counts[m][position] the amount of those where the cell at
+        position is a mine.
+    """
+    size = 1 + max(max(cells) for cells, _ in constraints)
+    constraints_of = [[] for _ in range(size)]
+    last_position = []
+    for index, (cells, _) in enumerate(constraints):
+        for position in cells:
+            constraints_of[position].append(index)
+        last_position.append(max(cells))
+    remaining_cells = [[sum(1 for cell in cells if cell > position)
+                        for cells, _ in constraints]
+                       for position in range(size)]
+    active = [tuple(index for index, (cells, _) in enumerate(constraints)
+                    if min(cells) < position <= last_position[index])
+              for position in range(size)]
+
+    def count(position, missing):
+        if position == size:
+            return (1,), ((),)
+        counts = []
+        cell_counts = []
+        for mine in (0, 1):
+            next_missing = list(missing)
+            possible = True
+            for index in constraints_of[position]:
+                next_missing[index] -= mine
+                if not (0 <= next_missing[index] <=
+                        remaining_cells[position][index]):
+                    possible = False
+            if not possible:
+                continue
+            next_missing = tuple(next_missing)
+            if position + 1 < size:
+                key = tuple(next_missing[index]
+                            for index in active[position + 1])
+            else:
+                key = ()
+            if (position + 1, key) not in memo:
+                memo[(position + 1, key)] = count(position + 1, next_missing)
+            sub_counts, sub_cell_counts = memo[(position + 1, key)]
+            for m, sub_count in enumerate(sub_counts):
+                if not sub_count:
+                    continue
+                while len(counts) <= m + mine:
+                    counts.append(0)
+                    cell_counts.append([0] * (size - position))
+                counts[m + mine] += sub_count
+                row = cell_counts[m + mine]
+                row[0] += sub_count * mine
+                for offset, value in enumerate(sub_cell_counts[m]):
+                    row[offset + 1] += value
+        return tuple(counts), tuple(tuple(row) for row in cell_counts)
+
+    memo = {}
+    counts, cell_counts = count(0, tuple(missing for _, missing in
+                                         constraints))
+    return counts, cell_counts
+
+
+def _approximate_layouts(size, constraints):
+    """
+    Estimate the mine probability of every cell in a component that is too
+    large to count, as the average density of its constraints, and treat the
+    component as if it always has the expected amount of mines.
+    """
+    densities = [[] for _ in range(size)]
+    for cells, missing in constraints:
+        for position in cells:
+            densities[position].append(missing / len(cells))
+    probabilities = [sum(values) / len(values) for values in densities]
+    expected = int(round(sum(probabilities)))
+    counts = [0] * expected + [1]
+    cell_counts = [[0] * size for _ in range(expected)] + [probabilities]
+    return counts, cell_counts
+
+
+def _convolve(a, b):
+    result = [0] * (len(a) + len(b) - 1)
+    for i, x in enumerate(a):
+        if x:
+            for j, y in enumerate(b):
+                result[i + j] += x * y
+    return result
+
+
+def _combinations(n, k):
+    if k < 0 or k > n:
+        return 0
+    return math.comb(n, k)
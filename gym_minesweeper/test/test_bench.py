@@ -0,0 +1,18 @@
+import json
+from unittest import TestCase
+
+from gym_minesweeper import bench
+
+
+class TestBench(TestCase):
+    def test_run(self):
+        results = bench.run(["beginner"], steps=20, resets=5, repeats=3,
+                            num_envs=4)
+
+        beginner = results["results"]["beginner"]
+        self.assertEqual(beginner["board"], bench.PRESETS["beginner"])
+        for key in ["steps per second", "resets per second",
+                    "worst flood fill seconds", "render seconds",
+                    "vector board steps per second"]:
+            self.assertGreater(beginner[key], 0)
+        json.dumps(results)
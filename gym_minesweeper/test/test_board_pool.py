@@ -0,0 +1,61 @@
+import os
+import tempfile
+from unittest import TestCase
+import gym
+import gym_minesweeper
+import numpy as np
+
+from gym_minesweeper.envs import BoardPool
+from gym_minesweeper.envs.board import label_zero_regions, neighbor_mine_counts
+
+
+class TestBoardPool(TestCase):
+    def test_boards(self):
+        pool = BoardPool(9, 7, 12, size=16, seed=0)
+        for _ in range(40):
+            mines, neighbor_mines, zero_regions = pool.take()
+            self.assertEqual(mines.shape, (9, 7))
+            self.assertEqual(np.count_nonzero(mines), 12)
+            np.testing.assert_array_equal(neighbor_mines,
+                                          neighbor_mine_counts(mines))
+            np.testing.assert_array_equal(
+                zero_regions, label_zero_regions(neighbor_mines))
+
+    def test_exclude(self):
+        pool = BoardPool(9, 9, 10, size=32, seed=1)
+        for _ in range(50):
+            mines = pool.take(exclude=np.array([0, 1, 9, 10]))[0]
+            self.assertFalse(mines.flat[[0, 1, 9, 10]].any())
+
+    def test_env(self):
+        pool = BoardPool(8, 8, 10, size=4, seed=2)
+        env = gym.make("Minesweeper-v0", board_pool=pool, seed=0)
+        for _ in range(10):
+            env.reset()
+            ob, reward, episode_over, info = env.step(27)
+            self.assertFalse(info["game over"])
+            self.assertEqual(np.count_nonzero(info["mine locations"]), 10)
+            env.unwrapped._assert_invariants()
+
+        with self.assertRaises(ValueError):
+            gym.make("Minesweeper-v0", mine_count=11, board_pool=pool)
+
+    def test_load(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "boards.npz")
+        pool = BoardPool(5, 4, 3, size=3, seed=3)
+        pool.save(path)
+
+        env = gym.make("Minesweeper-v0", width=5, height=4, mine_count=3,
+                       first_move_safe=False, board_pool=path)
+        for episode in range(6):
+            self.assertTrue(env.board_pool.fixed)
+            np.testing.assert_array_equal(env.unwrapped.mines,
+                                          pool.mines[episode % 3])
+            env.reset()
+
+        mines_path = os.path.join(directory.name, "boards.npy")
+        np.save(mines_path, pool.mines)
+        loaded = BoardPool.load(mines_path)
+        np.testing.assert_array_equal(loaded.zero_regions, pool.zero_regions)
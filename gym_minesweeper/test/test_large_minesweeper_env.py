@@ -0,0 +1,78 @@
+from unittest import TestCase
+import gym
+import gym_minesweeper
+import numpy as np
+
+from gym_minesweeper.envs import LargeMinesweeperEnv, MinesweeperEnv
+
+
+def full_board(env, attribute):
+    board = np.zeros((env.width, env.height), dtype=bool)
+    for (tile_x, tile_y), tile in env.tiles.items():
+        left, top = tile_x * env.tile_size, tile_y * env.tile_size
+        values = getattr(tile, attribute)
+        board[left:left + values.shape[0], top:top + values.shape[1]] = values
+    return board
+
+
+class TestLargeMinesweeperEnv(TestCase):
+    def test_step(self):
+        env = gym.make("MinesweeperLarge-v0", seed=0)
+        ob, reward, episode_over, info = env.step(0)
+
+        self.assertEqual(ob.shape, env.observation_space.shape)
+        self.assertGreater(reward, 0)
+        self.assertFalse(episode_over)
+        self.assertEqual(info["opened cells"], np.count_nonzero(
+            full_board(env.unwrapped, "open_cells")))
+
+    def test_invalid_action(self):
+        env = gym.make("MinesweeperLarge-v0", window_size=16, seed=0)
+        env.step(0)
+        cursor = env.unwrapped.cursor
+        for action in (-1, 256, 2 ** 40):
+            with self.assertRaises(ValueError):
+                env.step(action)
+        self.assertEqual(env.unwrapped.cursor, cursor)
+        self.assertEqual(env.unwrapped.steps, 1)
+
+    def test_matches_small_env(self):
+        env = LargeMinesweeperEnv(width=23, height=17, density=0.12,
+                                  window_size=17, tile_size=5, seed=1)
+        env.step(0)
+        # Generate every tile, and replay the same game on a normal board.
+        for tile_x in range(5):
+            for tile_y in range(4):
+                env._get_tile(tile_x, tile_y)
+        small_env = MinesweeperEnv(width=23, height=17,
+                                   mine_count=env.mines_count,
+                                   first_move_safe=False)
+        small_env.mines = full_board(env, "mines")
+        self.assertEqual(small_env.mines.sum(), env.mines_count)
+        x, y = env.window_origin
+        small_env.step(y * 23 + x)
+
+        rng = np.random.default_rng(0)
+        episode_over = False
+        while not episode_over:
+            origin_x, origin_y = env.window_origin
+            x, y = origin_x + rng.integers(17), origin_y + rng.integers(17)
+            ob, reward, episode_over, info = env.step(
+                (y - origin_y) * 17 + x - origin_x)
+            small_ob, small_reward, small_over, _ = small_env.step(y * 23 + x)
+
+            np.testing.assert_array_equal(
+                full_board(env, "open_cells"), small_env.open_cells)
+            self.assertAlmostEqual(reward, small_reward)
+            self.assertEqual(episode_over, small_over)
+            origin_x, origin_y = info["window origin"]
+            np.testing.assert_array_equal(
+                ob, small_ob[origin_x:origin_x + 17, origin_y:origin_y + 17])
+
+    def test_huge_board(self):
+        env = LargeMinesweeperEnv(width=10 ** 6, height=10 ** 6, seed=2)
+        for action in range(20):
+            ob, reward, episode_over, info = env.step(action * 12)
+            if episode_over:
+                break
+        self.assertLess(info["generated tiles"], 100)
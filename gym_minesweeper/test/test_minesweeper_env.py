@@ -1,6 +1,7 @@
 from unittest import TestCase, skip
 import gym
 import gym_minesweeper
+from gym_minesweeper.wrappers import InvariantChecker
 import numpy as np
 
 
@@ -66,14 +67,14 @@ class TestMinesweeperEnv(TestCase):
         ob, reward, episode_over, info = env.step(1)
 
         expected_mine_locations = np.array(
-            [[0, 0, 1, 0, 1, 0, 1, 1, ],
-             [0, 0, 0, 1, 0, 0, 1, 0, ],
-             [1, 0, 0, 1, 0, 0, 1, 0, ],
+            [[1, 0, 0, 0, 0, 0, 0, 1, ],
+             [0, 0, 0, 0, 0, 1, 0, 0, ],
+             [0, 0, 0, 1, 0, 0, 0, 0, ],
+             [0, 0, 0, 1, 0, 0, 0, 0, ],
              [0, 0, 0, 0, 0, 0, 0, 0, ],
-             [0, 0, 0, 0, 0, 0, 0, 0, ],
-             [0, 0, 0, 0, 0, 0, 0, 0, ],
-             [0, 0, 0, 0, 0, 0, 0, 0, ],
-             [0, 0, 0, 1, 0, 0, 0, 0, ]])
+             [0, 0, 0, 1, 1, 1, 0, 0, ],
+             [0, 0, 0, 0, 1, 0, 0, 0, ],
+             [0, 0, 0, 0, 0, 1, 0, 0, ]])
 
         np.testing.assert_array_equal(
             info["mine locations"],
@@ -88,8 +89,34 @@ class TestMinesweeperEnv(TestCase):
         mine_locations_2 = state[3]["mine locations"]
         self.assertFalse(np.array_equal(mine_locations_1, mine_locations_2))
 
+    def test_seed_is_per_instance(self):
+        env_1 = gym.make("Minesweeper-v0", seed=3)
+        env_2 = gym.make("Minesweeper-v0", seed=3)
+        env_1.reset()
+        gym.make("Minesweeper-v0", seed=4).reset()
+        env_2.reset()
+
+        np.testing.assert_array_equal(env_1.mines, env_2.mines)
+
+    def test_replay_episode(self):
+        env = gym.make("Minesweeper-v0")
+        env.reset(seed=5)
+        env.reset()
+        env.reset()
+        mines = env.mines.copy()
+        env.reset()
+
+        env.reset(episode=2)
+        np.testing.assert_array_equal(mines, env.mines)
+
+        env.seed(5)
+        env.reset()
+        env.reset()
+        env.reset()
+        np.testing.assert_array_equal(mines, env.mines)
+
     def test_first_open_is_mine(self):
-        env = gym.make("Minesweeper-v0", seed=0)
+        env = gym.make("Minesweeper-v0", seed=4, first_move_safe=False)
         ob, reward, episode_over, info = env.step(31)
         print(info["mine locations"])
         print(env.render("ansi"))
@@ -101,6 +128,35 @@ class TestMinesweeperEnv(TestCase):
         self.assertEqual(1, info["steps"])
         self.assertEqual(1, info["opened cells"])
 
+    def test_zero_reward_after_unnecessary_steps(self):
+        env = gym.make("Minesweeper-v0", flood_fill=False, punishment=1,
+                       seed=0)
+        env.reset()
+        env.step(0)
+        ob, reward, episode_over, info = env.step(0)
+        self.assertEqual(reward, 0)
+        self.assertFalse(episode_over)
+        # A score of 0 after the first step is fine to play on from.
+        ob, reward, episode_over, info = env.step(1)
+        self.assertEqual(info["steps"], 3)
+
+    def test_first_move_safe(self):
+        for action in range(64):
+            env = gym.make("Minesweeper-v0", mine_count=60, seed=action)
+            ob, reward, episode_over, info = env.step(action)
+            self.assertGreater(reward, 0)
+            self.assertEqual(info["mine locations"].sum(), 60)
+
+    def test_first_move_opening(self):
+        env = gym.make("Minesweeper-v0", mine_count=40,
+                       first_move_opening=True)
+        for action in range(64):
+            env.reset()
+            ob, reward, episode_over, info = env.step(action)
+            self.assertEqual(ob.flat[np.ravel_multi_index(
+                info["opened cell"], ob.shape)], 0)
+            self.assertEqual(info["mine locations"].sum(), 40)
+
     def test_reset_returns_observation(self):
         observation_reset = self.env.reset()
         observation_step = self.env.step(self.env.action_space.sample())[0]
@@ -125,3 +181,260 @@ class TestMinesweeperEnv(TestCase):
 
         self.assertTrue(self.env._is_done())
         self.assertEqual(0, info["unnecessary steps"])
+
+    def test_action_mask(self):
+        env = gym.make("Minesweeper-v0", width=7, height=5, mine_count=6,
+                       seed=2)
+        env.reset()
+        for _ in range(8):
+            ob, reward, episode_over, info = env.step(env.sample_legal())
+            np.testing.assert_array_equal(info["action mask"],
+                                          (ob == -1).T.ravel())
+            np.testing.assert_array_equal(
+                env.legal_actions(), np.flatnonzero(info["action mask"]))
+            if episode_over:
+                break
+
+    def test_counters_action_mask_is_a_view(self):
+        env = gym.make("Minesweeper-v0", info_level="counters", seed=2)
+        env.reset()
+        mask = env.step(0)[3]["action mask"]
+        self.assertFalse(mask.flags.writeable)
+        mask_copy = mask.copy()
+        info = env.step(env.sample_legal())[3]
+        self.assertIs(info["action mask"], mask)
+        self.assertLess(np.count_nonzero(mask), np.count_nonzero(mask_copy))
+        np.testing.assert_array_equal(env.legal_actions(),
+                                      np.flatnonzero(mask))
+
+    def test_sample_legal(self):
+        env = gym.make("Minesweeper-v0", seed=3)
+        env.reset()
+        episode_over = False
+        while not episode_over:
+            ob, reward, episode_over, info = env.step(env.sample_legal())
+        self.assertEqual(info["unnecessary steps"], 0)
+
+    def test_sample_legal_is_seeded(self):
+        actions = []
+        for _ in range(2):
+            env = gym.make("Minesweeper-v0", seed=3)
+            env.reset()
+            actions.append([env.sample_legal() for _ in range(10)])
+        self.assertEqual(actions[0], actions[1])
+
+    def test_get_state(self):
+        env = gym.make("Minesweeper-v0", seed=5)
+        env.reset()
+        env.step(0)
+        state = env.get_state()
+        self.assertLess(len(state), 64)
+
+        actions = [9, 18, 27, 36]
+        expected = [env.step(action) for action in actions]
+        env.set_state(state)
+        for action, (ob, reward, done, info) in zip(actions, expected):
+            step = env.step(action)
+            np.testing.assert_array_equal(step[0], ob)
+            self.assertEqual(step[1], reward)
+            np.testing.assert_array_equal(step[3]["action mask"],
+                                          info["action mask"])
+
+    def test_set_state_before_first_step(self):
+        env = gym.make("Minesweeper-v0", seed=6)
+        env.reset()
+        state = env.get_state()
+        mines = env.step(10)[3]["mine locations"]
+
+        other_env = gym.make("Minesweeper-v0", seed=6)
+        other_env.reset()
+        other_env.step(50)
+        other_env.set_state(state)
+        np.testing.assert_array_equal(other_env.step(10)[3]["mine locations"],
+                                      mines)
+
+    def test_flag(self):
+        env = gym.make("Minesweeper-v0", width=4, height=3, mine_count=2,
+                       extended_actions=True)
+        env.reset()
+        cells = env.width * env.height
+        self.assertEqual(env.action_space.n, 3 * cells)
+
+        ob, reward, episode_over, info = env.step(cells + 5)
+        self.assertEqual(ob[1, 1], -3)
+        self.assertEqual(reward, 0)
+        self.assertFalse(info["action mask"][5])
+        self.assertTrue(info["action mask"][cells + 5])
+
+        # Flagged cells can not be dug.
+        ob, reward, episode_over, info = env.step(5)
+        self.assertEqual(ob[1, 1], -3)
+        self.assertEqual(info["unnecessary steps"], 1)
+
+        ob, reward, episode_over, info = env.step(cells + 5)
+        self.assertEqual(ob[1, 1], -1)
+        self.assertTrue(info["action mask"][5])
+
+    def test_chord(self):
+        mines = np.zeros((5, 5), dtype=bool)
+        mines[0, 0] = True
+        mines[4, 4] = True
+        env = gym.make("Minesweeper-v0", width=5, height=5, mine_count=2,
+                       extended_actions=True, flood_fill=False)
+        env.reset()
+        env.mines = mines
+        cells = env.width * env.height
+
+        env.step(1 * 5 + 1)
+        # Chording without the flag does nothing.
+        info = env.step(2 * cells + 1 * 5 + 1)[3]
+        self.assertEqual(info["opened cells"], 1)
+        self.assertEqual(info["unnecessary steps"], 1)
+
+        env.step(cells + 0)
+        ob, reward, episode_over, info = env.step(2 * cells + 1 * 5 + 1)
+        self.assertEqual(info["opened cells"], 8)
+        self.assertFalse(episode_over)
+        np.testing.assert_array_equal(ob[:3, :3], [[-3, 1, 0],
+                                                   [1, 1, 0],
+                                                   [0, 0, 0]])
+
+    def test_chord_flood_fill(self):
+        env = gym.make("Minesweeper-v0", width=6, height=6, mine_count=1,
+                       extended_actions=True, first_move_safe=False)
+        env.reset()
+        mines = np.zeros((6, 6), dtype=bool)
+        mines[0, 0] = True
+        env.mines = mines
+        cells = env.width * env.height
+
+        env.step(1)
+        env.step(cells + 0)
+        ob, reward, episode_over, info = env.step(2 * cells + 1)
+        self.assertEqual(info["opened cells"], cells - 1)
+        self.assertTrue(episode_over)
+        self.assertEqual(reward, 1)
+
+    def test_first_dig_after_other_actions_is_safe(self):
+        for seed in range(50):
+            env = gym.make("Minesweeper-v0", width=4, height=4, mine_count=10,
+                           extended_actions=True, seed=seed)
+            cells = env.width * env.height
+            env.reset()
+            # Chording a closed cell, and digging a flagged one, do nothing.
+            env.step(2 * cells + 5)
+            env.step(cells + 5)
+            env.step(5)
+            ob, reward, episode_over, info = env.step(10)
+            self.assertFalse(episode_over)
+            self.assertEqual(info["unnecessary steps"], 2)
+
+    def test_chord_with_wrong_flags(self):
+        mines = np.zeros((3, 3), dtype=bool)
+        mines[0, 1] = True
+        mines[2, 1] = True
+        env = gym.make("Minesweeper-v0", width=3, height=3, mine_count=2,
+                       extended_actions=True, first_move_safe=False,
+                       debug=True)
+        env.reset()
+        env.mines = mines
+        cells = env.width * env.height
+
+        env.step(4)
+        env.step(cells + 0)
+        env.step(cells + 8)
+        # The chord opens both mines.
+        ob, reward, episode_over, info = env.step(2 * cells + 4)
+        self.assertTrue(episode_over)
+        self.assertTrue(info["game over"])
+        self.assertEqual(np.count_nonzero(ob == -2), 2)
+        self.assertLess(reward, 0)
+
+    def test_extended_actions_invariants(self):
+        # The seed also seeds the action space, so sample_legal() plays the
+        # same games on every run.
+        env = InvariantChecker(gym.make("Minesweeper-v0", mine_count=12,
+                                        extended_actions=True, seed=1))
+        for _ in range(10):
+            env.reset()
+            episode_over = False
+            while not episode_over:
+                ob, reward, episode_over, info = env.step(
+                    env.unwrapped.sample_legal())
+                self.assertTrue(env.observation_space.contains(ob))
+            state = env.unwrapped.get_state()
+            env.unwrapped.set_state(state)
+            env.unwrapped._assert_invariants()
+
+    def test_changed_cells(self):
+        env = gym.make("Minesweeper-v0", width=9, height=7, mine_count=10,
+                       extended_actions=True, seed=4)
+        observation = env.reset()
+        episode_over = False
+        while not episode_over:
+            ob, reward, episode_over, info = env.step(
+                env.unwrapped.sample_legal())
+            observation.flat[info["changed cells"]] = info["changed values"]
+            np.testing.assert_array_equal(observation, ob)
+
+    def test_copy_observation(self):
+        env = gym.make("Minesweeper-v0", copy_observation=False, seed=5)
+        first = env.reset()
+        ob = env.step(0)[0]
+
+        self.assertIs(first, ob)
+        self.assertFalse(ob.flags.writeable)
+        np.testing.assert_array_equal(ob, env.unwrapped._compute_observation())
+
+        mines = np.zeros((env.width, env.height), dtype=bool)
+        env.mines = mines
+        env.step(0)
+        np.testing.assert_array_equal(ob, np.where(env.open_cells, 0, -1))
+
+    def test_neighbor_mines(self):
+        env = gym.make("Minesweeper-v0", width=5, height=4, mine_count=6)
+        env.reset()
+
+        for x, y in np.ndindex(env.width, env.height):
+            expected = env.mines[max(x - 1, 0):x + 2,
+                                 max(y - 1, 0):y + 2].sum()
+            self.assertEqual(expected, env.neighbor_mines[x, y])
+
+    def test_flood_fill_large_board(self):
+        env = gym.make("Minesweeper-v0", width=200, height=200, mine_count=1)
+        env.reset()
+        env.mines = np.zeros((env.width, env.height))
+        env.mines[100, 100] = 1
+
+        ob, reward, episode_over, info = env.step(0)
+
+        self.assertEqual(info["opened cells"], env.width * env.height - 1)
+        self.assertEqual(ob[100, 100], -1)
+        self.assertEqual(ob[99, 99], 1)
+        self.assertTrue(episode_over)
+
+    def test_compact(self):
+        env = gym.make("Minesweeper-v0", compact=True)
+        observation_reset = env.reset()
+        ob, reward, episode_over, info = env.step(0)
+
+        self.assertEqual(env.observation_space.dtype, np.int8)
+        self.assertEqual(observation_reset.dtype, np.int8)
+        self.assertEqual(ob.dtype, np.int8)
+        self.assertEqual(env.mines.dtype, bool)
+        self.assertEqual(env.open_cells.dtype, bool)
+        self.assertTrue(env.observation_space.contains(ob))
+
+    def test_info_level(self):
+        env = gym.make("Minesweeper-v0", info_level="counters")
+        env.reset()
+        info = env.step(0)[3]
+        self.assertNotIn("mine locations", info)
+        self.assertEqual(info["steps"], 1)
+
+        env = gym.make("Minesweeper-v0", info_level="none")
+        env.reset()
+        self.assertEqual(env.step(0)[3], {})
+
+        with self.assertRaises(ValueError):
+            gym.make("Minesweeper-v0", info_level="everything")
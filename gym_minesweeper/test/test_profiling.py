@@ -0,0 +1,85 @@
+import json
+import tracemalloc
+from unittest import TestCase, mock
+import gym
+import gym_minesweeper
+import numpy as np
+
+from gym_minesweeper.envs import MinesweeperEnv, SharedMemoryVectorEnv
+from gym_minesweeper.profiling import PHASES, StepStats
+
+
+class TestProfiling(TestCase):
+    def test_disabled(self):
+        env = gym.make("Minesweeper-v0")
+        self.assertIsNone(env.unwrapped.stats)
+
+    def test_step_stats(self):
+        env = gym.make("Minesweeper-v0", profile=True, seed=0)
+        env.reset()
+        opened = 0
+        for _ in range(5):
+            ob, reward, episode_over, info = env.step(env.sample_legal())
+            opened = info["opened cells"]
+            if episode_over:
+                break
+        stats = env.unwrapped.stats.as_dict()
+
+        self.assertEqual(stats["steps"], info["steps"])
+        self.assertEqual(stats["cells revealed"]["total"], opened)
+        self.assertEqual(stats["phases"]["reset"]["count"], 2)
+        self.assertEqual(stats["phases"]["mines"]["count"], 1)
+        for phase in ["checks", "action", "observation", "reward", "done",
+                      "info"]:
+            self.assertEqual(stats["phases"][phase]["count"], info["steps"])
+            self.assertGreater(stats["phases"][phase]["total"], 0)
+        self.assertEqual(json.loads(env.unwrapped.stats.to_json()), stats)
+
+    def test_region_sizes(self):
+        env = gym.make("Minesweeper-v0", width=10, height=10, mine_count=1,
+                       profile=True, first_move_safe=False)
+        env.reset()
+        mines = np.zeros((10, 10), dtype=bool)
+        mines[9, 9] = True
+        env.mines = mines
+        env.step(0)
+
+        region_sizes = env.unwrapped.stats.region_sizes
+        self.assertEqual((region_sizes.count, region_sizes.total), (1, 99))
+
+    def test_allocations(self):
+        env = gym.make("Minesweeper-v0", profile="allocations")
+        self.addCleanup(tracemalloc.stop)
+        env.reset()
+        env.step(0)
+        self.assertGreater(env.unwrapped.stats.allocated_bytes.total, 0)
+
+    def test_allocations_without_reset_peak(self):
+        patcher = mock.patch("gym_minesweeper.profiling._RESET_PEAK", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        env = gym.make("Minesweeper-v0", profile="allocations")
+        self.addCleanup(tracemalloc.stop)
+        env.reset()
+        env.step(0)
+        env.step(1)
+        allocated_bytes = env.unwrapped.stats.allocated_bytes
+        self.assertEqual(allocated_bytes.count, 2)
+        self.assertGreaterEqual(allocated_bytes.maximum, 0)
+
+    def test_aggregate(self):
+        env_fns = [lambda: MinesweeperEnv(width=4, height=4, mine_count=2,
+                                          profile=True)
+                   for _ in range(4)]
+        env = SharedMemoryVectorEnv(env_fns, num_workers=2)
+        self.addCleanup(env.close)
+        env.reset()
+        for _ in range(3):
+            env.step(np.arange(4))
+        stats = env.get_stats()
+
+        self.assertEqual(stats.cells_revealed.count, 12)
+        self.assertEqual(set(stats.as_dict()["phases"]), set(PHASES))
+
+        single = StepStats.aggregate([stats.as_dict(), StepStats()])
+        self.assertEqual(single.as_dict(), stats.as_dict())
@@ -0,0 +1,37 @@
+import importlib
+import subprocess
+import sys
+from unittest import TestCase
+import gym
+import gym_minesweeper
+
+
+class TestRegistration(TestCase):
+    def test_difficulties(self):
+        for env_id, (width, height, mine_count) in [
+                ("MinesweeperBeginner-v0", (9, 9, 10)),
+                ("MinesweeperIntermediate-v0", (16, 16, 40)),
+                ("MinesweeperExpert-v0", (30, 16, 99)),
+                ("MinesweeperHard-v0", (30, 16, 99))]:
+            env = gym.make(env_id).unwrapped
+            self.assertEqual((env.width, env.height, env.mines_count),
+                             (width, height, mine_count))
+
+    def test_reimport(self):
+        spec = gym.spec("Minesweeper-v0")
+        importlib.reload(gym_minesweeper)
+        self.assertIs(gym.spec("Minesweeper-v0"), spec)
+
+    def test_import_is_silent_and_lazy(self):
+        code = ("import sys, gym_minesweeper.envs; "
+                "print(sorted(m for m in sys.modules "
+                "if m.startswith('gym_minesweeper')))")
+        output = subprocess.run([sys.executable, "-c", code],
+                                capture_output=True, text=True, check=True)
+        self.assertEqual(output.stdout.strip(), str(sorted([
+            "gym_minesweeper", "gym_minesweeper.envs",
+            "gym_minesweeper.envs.board",
+            "gym_minesweeper.envs.board_pool",
+            "gym_minesweeper.envs.minesweeper_env",
+            "gym_minesweeper.profiling",
+            "gym_minesweeper.rendering"])))
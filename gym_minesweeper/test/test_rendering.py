@@ -0,0 +1,77 @@
+import os
+from unittest import TestCase, mock
+import gym
+import gym_minesweeper
+import numpy as np
+
+from gym_minesweeper.rendering import COLORS, RgbRenderer, render_rgb
+
+
+class TestRendering(TestCase):
+    def test_render_rgb(self):
+        observation = np.array([[-2, -1, 0, 1],
+                                [2, 3, 4, 5],
+                                [6, 7, 8, 0]], dtype=np.float32)
+        img = render_rgb(observation, zoom=3)
+
+        self.assertEqual(img.shape, (9, 12, 3))
+        self.assertEqual(img.dtype, np.uint8)
+        for (x, y), cell in np.ndenumerate(observation):
+            block = img[x * 3:x * 3 + 3, y * 3:y * 3 + 3]
+            np.testing.assert_array_equal(
+                block, np.broadcast_to(COLORS[cell], (3, 3, 3)))
+
+    def test_render_batch(self):
+        observations = np.random.randint(-2, 9, size=(5, 4, 3))
+        images = render_rgb(observations, zoom=2)
+
+        self.assertEqual(images.shape, (5, 8, 6, 3))
+        for observation, image in zip(observations, images):
+            np.testing.assert_array_equal(render_rgb(observation, zoom=2),
+                                          image)
+
+    def test_renderer_reuses_buffer(self):
+        renderer = RgbRenderer(zoom=4)
+        first = renderer.render(np.zeros((2, 2)))
+        second = renderer.render(np.ones((2, 2)))
+
+        self.assertIs(first, second)
+        np.testing.assert_array_equal(second[0, 0], COLORS[1])
+
+    def test_env_render_zoom(self):
+        env = gym.make("Minesweeper-v0", render_zoom=5)
+        env.reset()
+        self.assertEqual(env.render("rgb_array").shape, (40, 40, 3))
+
+    def test_vector_env_render(self):
+        env = gym.make("MinesweeperVector-v0", num_envs=3, render_zoom=2)
+        env.reset()
+        self.assertEqual(env.render().shape, (3, 16, 16, 3))
+
+    def test_monitor_render_drops_frames(self):
+        # Draw off screen, without a display.
+        patcher = mock.patch.dict(os.environ, {"MPLBACKEND": "Agg"})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        import matplotlib
+        matplotlib.use("Agg")
+
+        env = gym.make("Minesweeper-v0", monitor_fps=1)
+        self.addCleanup(env.close)
+        env.reset()
+        env.render("monitor")
+        window = env.unwrapped.window
+        env.step(0)
+        for _ in range(10):
+            env.render("monitor")
+
+        # Only the first render is drawn within a second.
+        self.assertEqual(window.frames_drawn, 1)
+        self.assertIsNotNone(window._background)
+        window._last_frame = None
+        env.render("monitor")
+        # The second frame is blitted, and shows the latest observation.
+        self.assertEqual(window.frames_drawn, 2)
+        np.testing.assert_array_equal(
+            window.imshow_obj.get_array(),
+            render_rgb(env.unwrapped._get_observation(), zoom=1))
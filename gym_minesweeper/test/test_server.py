@@ -0,0 +1,91 @@
+import asyncio
+import os
+import tempfile
+from unittest import TestCase
+import numpy as np
+
+from gym_minesweeper.envs import MinesweeperEnv
+from gym_minesweeper.server import MinesweeperClient, MinesweeperServer
+
+
+class TestServer(TestCase):
+    def run_with_server(self, play, path=None, **env_kwargs):
+        async def run():
+            server = await MinesweeperServer(**env_kwargs).start(path=path)
+            client = await MinesweeperClient.connect(
+                port=None if path else server.port, path=path,
+                max_in_flight=4)
+            try:
+                return await play(client)
+            finally:
+                await client.close()
+                await server.close()
+
+        return asyncio.run(run())
+
+    def test_matches_local_env(self):
+        env_kwargs = {"width": 6, "height": 5, "mine_count": 5, "seed": 3}
+        rng = np.random.default_rng(0)
+        actions = rng.integers(30, size=(10, 8))
+
+        async def play(client):
+            ids = await client.create(8)
+            observations = await client.reset(ids)
+            # Send all steps at once, they are answered in order.
+            results = await asyncio.gather(*[client.step(ids, step_actions)
+                                             for step_actions in actions])
+            return observations, results
+
+        observations, results = self.run_with_server(play, **env_kwargs)
+        np.testing.assert_array_equal(observations, -1)
+
+        for i in range(8):
+            env = MinesweeperEnv(**env_kwargs)
+            env.reset()
+            done = False
+            for step_actions, (obs, rewards, dones) in zip(actions, results):
+                if done:
+                    break
+                ob, reward, done, _ = env.step(step_actions[i])
+                np.testing.assert_array_equal(obs[i], ob)
+                self.assertAlmostEqual(rewards[i], reward, places=6)
+                self.assertEqual(dones[i], done)
+
+    def test_error(self):
+        async def play(client):
+            ids = await client.create(2)
+            await client.reset(ids)
+            with self.assertRaises(RuntimeError):
+                await client.step([5], [0])
+            # The connection is still usable after an error.
+            return await client.step(ids, [0, 0])
+
+        obs, rewards, dones = self.run_with_server(play)
+        self.assertEqual(obs.shape, (2, 8, 8))
+
+    def test_cancelled_request(self):
+        async def play(client):
+            ids = await client.create(2)
+            request = asyncio.ensure_future(client.reset(ids))
+            while not client._pending:
+                await asyncio.sleep(0)
+            request.cancel()
+            # The answer to the cancelled request arrives first, and is
+            # dropped.
+            return await asyncio.wait_for(client.reset(ids), timeout=5)
+
+        obs = self.run_with_server(play)
+        np.testing.assert_array_equal(obs, -1)
+
+    def test_unix_socket(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "minesweeper.sock")
+
+        async def play(client):
+            ids = await client.create(3)
+            await client.reset(ids)
+            return await client.step(ids, [0, 1, 2])
+
+        obs, rewards, dones = self.run_with_server(play, path=path)
+        self.assertTrue(np.all(rewards > 0))
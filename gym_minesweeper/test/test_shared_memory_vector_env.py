@@ -0,0 +1,39 @@
+from unittest import TestCase
+import numpy as np
+
+from gym_minesweeper.envs import MinesweeperEnv, SharedMemoryVectorEnv
+
+
+class TestSharedMemoryVectorEnv(TestCase):
+    def setUp(self) -> None:
+        env_fns = [lambda: MinesweeperEnv(width=3, height=3, mine_count=8,
+                                          debug=False)
+                   for _ in range(5)]
+        self.env = SharedMemoryVectorEnv(env_fns, num_workers=2)
+
+    def tearDown(self) -> None:
+        self.env.close()
+
+    def test_reset(self):
+        observations = self.env.reset()
+
+        self.assertEqual(observations.shape, (5, 3, 3))
+        np.testing.assert_array_equal(observations, -1)
+
+    def test_step(self):
+        self.env.reset()
+        obs, rewards, dones, info = self.env.step(np.arange(5))
+
+        # Opening the only safe cell wins the game, so every env is reset.
+        self.assertTrue(np.all(dones))
+        np.testing.assert_array_equal(rewards, 1)
+        np.testing.assert_array_equal(obs, -1)
+        np.testing.assert_array_equal(info["opened cells"], 1)
+        np.testing.assert_array_equal(info["steps"], 1)
+        self.assertEqual(
+            np.count_nonzero(info["terminal observation"] >= 0), 5)
+
+    def test_worker_error(self):
+        self.env.reset()
+        with self.assertRaises(RuntimeError):
+            self.env.step([100] * 5)
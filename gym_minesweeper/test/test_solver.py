@@ -0,0 +1,83 @@
+import itertools
+from unittest import TestCase
+import gym
+import gym_minesweeper
+import numpy as np
+
+from gym_minesweeper.envs.board import neighbor_mine_counts
+from gym_minesweeper.solver import known_cells, mine_probabilities
+
+
+def brute_force_probabilities(observation, mine_count):
+    closed = np.flatnonzero(observation == -1)
+    numbers = observation >= 0
+    total = np.zeros(observation.shape)
+    layouts = 0
+    for chosen in itertools.combinations(closed, mine_count):
+        mines = np.zeros(observation.shape, dtype=bool)
+        mines.flat[list(chosen)] = True
+        counts = neighbor_mine_counts(mines)
+        if np.array_equal(counts[numbers], observation[numbers]):
+            total += mines
+            layouts += 1
+    return total / layouts
+
+
+class TestSolver(TestCase):
+    def test_single_point(self):
+        # x 1 .
+        # x 1 .
+        # 1 1 .
+        observation = np.array([[-1, 1, 0],
+                                [-1, 1, 0],
+                                [1, 1, 0]]).T
+        safe, mines = known_cells(observation)
+
+        self.assertTrue(mines[0, 1])
+        self.assertTrue(safe[0, 0])
+        self.assertEqual(np.count_nonzero(np.logical_or(safe, mines)), 2)
+
+    def test_subsets(self):
+        # x x x
+        # 1 1 1
+        # . . .
+        # No number alone shows anything, but the left 1 shares its cells
+        # with the middle 1, so the top right cell is safe.
+        observation = np.array([[-1, -1, -1],
+                                [1, 1, 1],
+                                [0, 0, 0]]).T
+        safe, mines = known_cells(observation)
+
+        np.testing.assert_array_equal(mines[:, 0], [False, True, False])
+        np.testing.assert_array_equal(safe[:, 0], [True, False, True])
+
+    def test_probabilities(self):
+        rng = np.random.default_rng(0)
+        for seed in range(30):
+            env = gym.make("Minesweeper-v0", width=4, height=4,
+                           mine_count=4, seed=seed)
+            ob, reward, episode_over, info = env.step(
+                int(rng.integers(16)))
+            if episode_over:
+                continue
+            np.testing.assert_allclose(env.mine_probabilities(),
+                                       brute_force_probabilities(ob, 4))
+
+    def test_probabilities_of_new_board(self):
+        probabilities = mine_probabilities(np.full((4, 5), -1), mine_count=4)
+        np.testing.assert_allclose(probabilities, 4 / 20)
+
+    def test_env_safe_actions(self):
+        env = gym.make("Minesweeper-v0", seed=0)
+        ob, reward, episode_over, info = env.step(0)
+        while not episode_over and env.safe_actions().size:
+            for action in env.safe_actions():
+                x, y = env._parse_action(action)
+                self.assertFalse(info["mine locations"][x, y])
+            ob, reward, episode_over, info = env.step(env.safe_actions()[0])
+        self.assertGreater(reward, 0)
+
+        probabilities = env.mine_probabilities()
+        self.assertEqual(probabilities.shape, ob.shape)
+        self.assertAlmostEqual(probabilities[ob == -1].sum(),
+                               env.mines_count)
@@ -0,0 +1,115 @@
+from unittest import TestCase
+import gym
+import gym_minesweeper
+import numpy as np
+
+
+class TestVectorMinesweeperEnv(TestCase):
+    def setUp(self) -> None:
+        self.env = gym.make("MinesweeperVector-v0", num_envs=4, seed=0)
+        self.env.reset()
+
+    def test_step(self):
+        actions = self.env.action_space.sample()
+        obs, rewards, dones, info = self.env.step(actions)
+
+        self.assertEqual(obs.shape, (4, 8, 8))
+        self.assertEqual(obs.shape, self.env.observation_space.shape)
+        self.assertEqual(rewards.shape, (4,))
+        self.assertEqual(dones.shape, (4,))
+        self.assertEqual(info["mine locations"].shape, (4, 8, 8))
+        np.testing.assert_array_equal(info["steps"], 1)
+        # The first move is safe, so no board can be lost yet.
+        self.assertTrue(np.all(rewards > 0))
+
+    def test_matches_single_env(self):
+        env = gym.make("MinesweeperVector-v0", num_envs=6, width=9,
+                       height=7, mine_count=12, seed=1,
+                       first_move_safe=False)
+        env.reset()
+        single_envs = []
+        for mines in env.mines:
+            single_env = gym.make("Minesweeper-v0", width=9, height=7,
+                                  mine_count=12, first_move_safe=False)
+            single_env.reset()
+            single_env.mines = mines.astype(float)
+            single_envs.append(single_env)
+
+        rng = np.random.default_rng(0)
+        finished = np.zeros(env.num_envs, dtype=bool)
+        for _ in range(20):
+            actions = rng.integers(env.single_action_space.n, size=6)
+            obs, rewards, dones, info = env.step(actions)
+            for i, single_env in enumerate(single_envs):
+                if finished[i]:
+                    continue
+                ob, reward, done, _ = single_env.step(actions[i])
+                np.testing.assert_array_equal(
+                    ob, info["terminal observation"][i])
+                self.assertAlmostEqual(reward, rewards[i])
+                self.assertEqual(done, dones[i])
+            finished |= dones
+
+    def test_auto_reset(self):
+        env = gym.make("MinesweeperVector-v0", num_envs=3, width=3,
+                       height=3, mine_count=8)
+        env.reset()
+        obs, rewards, dones, info = env.step([0, 4, 8])
+
+        self.assertTrue(np.all(dones))
+        np.testing.assert_array_equal(obs, -1)
+        np.testing.assert_array_equal(env.steps, 0)
+        self.assertEqual(np.count_nonzero(info["terminal observation"] >= 0),
+                         3)
+
+    def test_action_mask(self):
+        env = gym.make("MinesweeperVector-v0", num_envs=3, width=3,
+                       height=3, mine_count=1)
+        env.reset()
+        obs, rewards, dones, info = env.step([0, 4, 8])
+        obs, rewards, dones, info = env.step([1, 1, 1])
+
+        np.testing.assert_array_equal(info["action mask"],
+                                      (obs == -1).transpose(0, 2, 1)
+                                      .reshape(3, -1))
+
+    def test_invalid_action(self):
+        for action in (-1, 64):
+            with self.assertRaises(ValueError):
+                self.env.step([0, 1, action, 3])
+        np.testing.assert_array_equal(self.env.steps, 0)
+
+    def test_seed(self):
+        env_1 = gym.make("MinesweeperVector-v0", num_envs=3, seed=7)
+        env_2 = gym.make("MinesweeperVector-v0", num_envs=3)
+        env_2.seed(7)
+        env_2.reset()
+        info_1 = env_1.step([0, 1, 2])[3]
+        info_2 = env_2.step([0, 1, 2])[3]
+
+        np.testing.assert_array_equal(info_1["mine locations"],
+                                      info_2["mine locations"])
+        self.assertFalse(np.array_equal(info_1["mine locations"][0],
+                                        info_1["mine locations"][1]))
+
+    def test_seed_without_reset(self):
+        env_1 = gym.make("MinesweeperVector-v0", num_envs=3, seed=7)
+        env_2 = gym.make("MinesweeperVector-v0", num_envs=3, seed=0)
+        env_2.seed(7)
+        info_1 = env_1.step([0, 1, 2])[3]
+        info_2 = env_2.step([0, 1, 2])[3]
+
+        np.testing.assert_array_equal(info_2["steps"], 1)
+        np.testing.assert_array_equal(info_1["mine locations"],
+                                      info_2["mine locations"])
+
+    def test_first_move_opening(self):
+        env = gym.make("MinesweeperVector-v0", num_envs=64, mine_count=40,
+                       first_move_opening=True)
+        obs, rewards, dones, info = env.step(np.arange(64))
+
+        np.testing.assert_array_equal(info["mine locations"].sum(axis=(1, 2)),
+                                      40)
+        x, y = info["opened cell"].T
+        np.testing.assert_array_equal(
+            info["terminal observation"][np.arange(64), x, y], 0)
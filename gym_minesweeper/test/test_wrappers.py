@@ -0,0 +1,109 @@
+import os
+import tempfile
+from unittest import TestCase
+import gym
+import numpy as np
+import gym_minesweeper
+from gym_minesweeper.trajectories import TrajectoryReader
+from gym_minesweeper.wrappers import InvariantChecker, TrajectoryRecorder
+
+
+class TestInvariantChecker(TestCase):
+    def test_full_games(self):
+        for mine_count in [1, 10, 40]:
+            env = InvariantChecker(
+                gym.make("Minesweeper-v0", mine_count=mine_count))
+            for _ in range(5):
+                env.reset()
+                episode_over = False
+                while not episode_over:
+                    ob, reward, episode_over, info = env.step(
+                        env.action_space.sample())
+
+    def test_detects_broken_invariant(self):
+        env = InvariantChecker(gym.make("Minesweeper-v0"), every=2)
+        env.reset()
+        env.step(0)
+        env.unwrapped.opened_cells_count += 1
+
+        with self.assertRaises(AssertionError):
+            env.step(0)
+
+
+class TestTrajectoryRecorder(TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "games.bin")
+
+    def test_replay(self):
+        env = TrajectoryRecorder(
+            gym.make("Minesweeper-v0", width=9, height=5, seed=0), self.path)
+        episodes = []
+        for _ in range(3):
+            env.reset()
+            episode_over = False
+            steps = []
+            while not episode_over:
+                ob, reward, episode_over, info = env.step(env.sample_legal())
+                steps.append((ob, reward, info["mine locations"]))
+            episodes.append(steps)
+        env.close()
+
+        reader = TrajectoryReader(self.path)
+        self.assertEqual(len(reader), 3)
+        self.assertEqual((reader.width, reader.height), (9, 5))
+        for episode, steps in enumerate(episodes):
+            self.assertEqual(reader.lengths[episode], len(steps))
+            np.testing.assert_array_equal(reader.mines(episode), steps[0][2])
+            np.testing.assert_allclose(reader.rewards(episode),
+                                       [reward for _, reward, _ in steps],
+                                       rtol=1e-6)
+            np.testing.assert_array_equal(reader.observations(episode),
+                                          [ob for ob, _, _ in steps])
+        np.testing.assert_array_equal(reader.observation(1, 0),
+                                      episodes[1][0][0])
+
+    def test_replay_extended_actions(self):
+        env = TrajectoryRecorder(
+            gym.make("Minesweeper-v0", extended_actions=True, seed=2),
+            self.path)
+        cells = env.width * env.height
+        env.reset()
+        ob, reward, episode_over, info = env.step(0)
+        observations = [ob]
+        # Flag a closed cell and chord the first opened number, which may
+        # open a mine if the flag is wrong, then play on.
+        number = np.flatnonzero(ob.T.ravel() > 0)[0]
+        closed = np.flatnonzero(ob.T.ravel() == -1)[0]
+        actions = [cells + closed, 2 * cells + number]
+        while not episode_over:
+            action = actions.pop(0) if actions else \
+                env.unwrapped.sample_legal()
+            ob, reward, episode_over, info = env.step(action)
+            observations.append(ob)
+        env.close()
+
+        reader = TrajectoryReader(self.path)
+        self.assertTrue(reader.extended_actions)
+        np.testing.assert_array_equal(reader.actions(0)[1:3],
+                                      [cells + closed, 2 * cells + number])
+        np.testing.assert_array_equal(reader.observations(0), observations)
+
+    def test_append(self):
+        for seed in range(2):
+            env = TrajectoryRecorder(
+                gym.make("Minesweeper-v0", seed=seed), self.path)
+            env.reset()
+            env.step(0)
+            env.step(1)
+            # Resetting writes the unfinished episode.
+            env.reset()
+            env.close()
+
+        reader = TrajectoryReader(self.path)
+        self.assertEqual(len(reader), 2)
+        np.testing.assert_array_equal(reader.actions(1), [0, 1])
+
+        with self.assertRaises(ValueError):
+            TrajectoryRecorder(gym.make("Minesweeper-v0", width=5), self.path)
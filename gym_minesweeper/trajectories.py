@@ -0,0 +1,141 @@
+"""
+A compact file format for recorded minesweeper games.
+
+A file starts with a header holding the board size, and whether the games
+were played with flood fill and with extended actions (flags and chords).
+It is followed by one record per episode: the amount of steps, the mines
+packed into bits, the actions as int32 and the rewards as float32. Every
+part of a record is padded to a multiple of 4 bytes, so the actions and
+rewards can be read in place from a memory map.
+
+Observations are not stored. TrajectoryReader reconstructs them by
+replaying the actions on the recorded mines.
+
+Files are written by gym_minesweeper.wrappers.TrajectoryRecorder.
+"""
+import struct
+
+import numpy as np
+
+MAGIC = b"MSWP"
+VERSION = 2
+# magic, version, flood fill, extended actions, width and height.
+FILE_HEADER = struct.Struct("<4sBBBxII")
+# The amount of steps in the episode.
+EPISODE_HEADER = struct.Struct("<I")
+
+
+def packed_mines_size(width, height):
+    """The size in bytes of the packed mines of a record, with padding."""
+    size = (width * height + 7) // 8
+    return size + -size % 4
+
+
+def pack_episode(mines, actions, rewards):
+    """
+    Encode one episode as a record. mines is a boolean array of shape
+    (width, height).
+    """
+    mines = np.packbits(np.asarray(mines, dtype=bool)).tobytes()
+    padding = -len(mines) % 4
+    return b"".join([
+        EPISODE_HEADER.pack(len(actions)),
+        mines, b"\0" * padding,
+        np.asarray(actions, dtype="<i4").tobytes(),
+        np.asarray(rewards, dtype="<f4").tobytes(),
+    ])
+
+
+class TrajectoryReader:
+    """
+    Reads a file written by TrajectoryRecorder through a memory map, so only
+    the parts that are accessed are loaded.
+
+    Opening the file reads the header of every episode, to find where the
+    episodes start. After that, the mines, actions, rewards and
+    observations of any episode can be read without reading the others.
+    """
+
+    def __init__(self, path):
+        self._data = np.memmap(path, dtype=np.uint8, mode="r")
+        (magic, version, flood_fill, extended_actions, self.width,
+         self.height) = FILE_HEADER.unpack_from(self._data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("{} is not a trajectory file of version {}"
+                             .format(path, VERSION))
+        self.flood_fill = bool(flood_fill)
+        self.extended_actions = bool(extended_actions)
+        self._mines_size = packed_mines_size(self.width, self.height)
+
+        offsets = []
+        lengths = []
+        offset = FILE_HEADER.size
+        while offset < self._data.size:
+            steps, = EPISODE_HEADER.unpack_from(self._data, offset)
+            offsets.append(offset + EPISODE_HEADER.size)
+            lengths.append(steps)
+            offset += EPISODE_HEADER.size + self._mines_size + 8 * steps
+        self._offsets = np.array(offsets, dtype=np.int64)
+        self.lengths = np.array(lengths, dtype=np.int64)
+        self._replay_env = None
+        self._replay_position = None
+
+    def __len__(self):
+        return self._offsets.size
+
+    def mines(self, episode):
+        """The mines of an episode, as a boolean array (width, height)."""
+        offset = self._offsets[episode]
+        packed = self._data[offset:offset + self._mines_size]
+        mines = np.unpackbits(packed, count=self.width * self.height)
+        return mines.view(bool).reshape(self.width, self.height)
+
+    def actions(self, episode):
+        """The actions of an episode, as a read-only int32 array."""
+        start = self._offsets[episode] + self._mines_size
+        return self._data[start:start + 4 * self.lengths[episode]].view("<i4")
+
+    def rewards(self, episode):
+        """The rewards of an episode, as a read-only float32 array."""
+        start = (self._offsets[episode] + self._mines_size +
+                 4 * self.lengths[episode])
+        return self._data[start:start + 4 * self.lengths[episode]].view("<f4")
+
+    def observation(self, episode, step):
+        """
+        The observation returned by step `step` (counting from 0) of an
+        episode, reconstructed by replaying its actions. Reading the steps
+        of an episode in increasing order only replays every action once.
+        """
+        if not 0 <= step < self.lengths[episode]:
+            raise IndexError("Episode {} has {} steps, not {}".format(
+                episode, self.lengths[episode], step + 1))
+        env = self._replay_env
+        if env is None:
+            # Imported here, since the envs are not needed to read the
+            # actions and rewards.
+            from gym_minesweeper.envs import MinesweeperEnv
+            env = self._replay_env = MinesweeperEnv(
+                width=self.width, height=self.height, mine_count=0,
+                flood_fill=self.flood_fill, first_move_safe=False,
+                info_level="none", extended_actions=self.extended_actions)
+
+        position = self._replay_position
+        if position is None or position[0] != episode or position[1] > step:
+            env.reset()
+            env.mines = self.mines(episode)
+            env.mines_count = int(np.count_nonzero(env.mines))
+            position = (episode, -1)
+        actions = self.actions(episode)
+        for index in range(position[1] + 1, step + 1):
+            env.step(int(actions[index]))
+        self._replay_position = (episode, step)
+        return env._get_observation()
+
+    def observations(self, episode):
+        """
+        All observations of an episode, as an array of shape
+        (steps, width, height).
+        """
+        return np.stack([self.observation(episode, step)
+                         for step in range(self.lengths[episode])])
@@ -2,7 +2,10 @@
 This file is taken from https://github.com/maximecb/gym-minigrid/blob/master/gym_minigrid/window.py
 '''
 
+import os
 import sys
+import time
+
 import numpy as np
 
 # Only ask users to install matplotlib if they actually need it
@@ -10,7 +13,10 @@ try:
     import matplotlib.pyplot as plt
     import matplotlib
 
-    matplotlib.use('tkagg')
+    # Respect a backend that was chosen explicitly, for example Agg on a
+    # machine without a display.
+    if "MPLBACKEND" not in os.environ:
+        matplotlib.use('tkagg')
 except:
     print('To display the environment in a window, please install matplotlib, '
           'eg:pip3 install --user matplotlib.\n'
@@ -22,18 +28,28 @@ except:
 class Window:
     """
     Window to draw a gridworld instance using Matplotlib
+
+    After the first image, show_img only redraws the image by blitting it
+    onto the saved background. With max_fps, images that arrive sooner than
+    1 / max_fps seconds after the last drawn frame are not drawn; the
+    image is still stored, so the next drawn frame shows the latest one.
     """
 
-    def __init__(self, title):
+    def __init__(self, title, max_fps=None):
         self.fig = None
 
         self.imshow_obj = None
+        self.max_fps = max_fps
+        self.frames_drawn = 0
+        self._last_frame = None
+        self._background = None
+        self._needs_draw = True
 
         # Create the figure and axes
         self.fig, self.ax = plt.subplots()
 
         # Show the env name in the window title
-        self.fig.canvas.set_window_title(title)
+        self.set_title(title)
 
         # Turn off x/y axis numbering/ticks
         self.ax.xaxis.set_ticks_position('none')
@@ -48,29 +64,80 @@ class Window:
             self.closed = True
 
         self.fig.canvas.mpl_connect('close_event', close_handler)
+        self.fig.canvas.mpl_connect('draw_event', self._on_draw)
 
-    def show_img(self, img):
+    def frame_due(self):
         """
-        Show an image or update the image being shown
+        Whether show_img would draw a frame now, so callers can skip
+        building an image that would not be drawn
         """
 
-        # Show the first image of the environment
-        if self.imshow_obj is None:
-            self.imshow_obj = self.ax.imshow(img, interpolation='nearest')
+        return (not self.max_fps or self._last_frame is None or
+                time.perf_counter() - self._last_frame >= 1 / self.max_fps)
 
-        self.imshow_obj.set_data(img)
-        self.fig.canvas.draw()
+    def show_img(self, img, title=None):
+        """
+        Show an image or update the image being shown, and set the window
+        title if the frame is drawn. Returns whether the frame was drawn.
+        """
 
-        # Let matplotlib process UI events
-        # This is needed for interactive mode to work properly
-        plt.pause(0.001)
+        # Show the first image of the environment
+        if self.imshow_obj is None:
+            # Animated artists are left out of full redraws, and are only
+            # drawn by blitting.
+            self.imshow_obj = self.ax.imshow(img, interpolation='nearest',
+                                             animated=True)
+            self._needs_draw = True
+        else:
+            self.imshow_obj.set_data(img)
+
+        if not self.frame_due():
+            return False
+        self._last_frame = time.perf_counter()
+        if title is not None:
+            self.set_title(title)
+
+        canvas = self.fig.canvas
+        if (self._needs_draw or self._background is None or
+                not canvas.supports_blit):
+            # Draws everything, and saves the background in _on_draw.
+            self._needs_draw = False
+            canvas.draw()
+        else:
+            canvas.restore_region(self._background)
+            self.ax.draw_artist(self.imshow_obj)
+            canvas.blit(self.ax.bbox)
+
+        # Let matplotlib process UI events, without sleeping like
+        # plt.pause does
+        canvas.flush_events()
+        self.frames_drawn += 1
+        return True
+
+    def _on_draw(self, event):
+        # A full draw, for example after the window was resized, changes
+        # the background behind the image.
+        self._background = self.fig.canvas.copy_from_bbox(self.ax.bbox)
+        if self.imshow_obj is not None:
+            self.ax.draw_artist(self.imshow_obj)
 
     def set_caption(self, text):
         """
         Set/update the caption text below the image
         """
 
-        plt.xlabel(text)
+        self.ax.set_xlabel(text)
+        # The caption is outside of the blitted area.
+        self._needs_draw = True
+
+    def set_title(self, title):
+        """
+        Set the window title
+        """
+
+        manager = self.fig.canvas.manager
+        if manager is not None:
+            manager.set_window_title(title)
 
     def reg_key_handler(self, key_handler):
         """
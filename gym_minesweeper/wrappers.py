@@ -0,0 +1,94 @@
+import gym
+
+from gym_minesweeper.trajectories import (FILE_HEADER, MAGIC, VERSION,
+                                          pack_episode)
+
+
+class InvariantChecker(gym.Wrapper):
+    """
+    Checks the internal invariants of a MinesweeperEnv after every reset and
+    after every `every`-th step, and raises an AssertionError if one is
+    broken.
+
+    Creating the env with debug=True checks the invariants on every step as
+    well, but also prints every opened cell.
+    """
+
+    def __init__(self, env, every=1):
+        super().__init__(env)
+        self.every = every
+        self._steps_since_check = 0
+
+    def reset(self, **kwargs):
+        observation = self.env.reset(**kwargs)
+        self._check()
+        return observation
+
+    def step(self, action):
+        result = self.env.step(action)
+        self._steps_since_check += 1
+        if self._steps_since_check >= self.every:
+            self._check()
+        return result
+
+    def _check(self):
+        self.env.unwrapped._assert_invariants()
+        self._steps_since_check = 0
+
+
+class TrajectoryRecorder(gym.Wrapper):
+    """
+    Appends every episode played with a MinesweeperEnv to a file, in the
+    format described in gym_minesweeper.trajectories: the mines once per
+    episode, followed by the actions and rewards. Read the file with
+    gym_minesweeper.trajectories.TrajectoryReader.
+
+    An episode is written when it is done, or when the env is reset or
+    closed before that. Episodes without steps are not written. If the file
+    already exists, the episodes are appended to it, as long as it was
+    recorded on boards of the same size.
+    """
+
+    def __init__(self, env, path):
+        super().__init__(env)
+        board = env.unwrapped
+        header = FILE_HEADER.pack(MAGIC, VERSION, bool(board.flood_fill),
+                                  bool(board.extended_actions), board.width,
+                                  board.height)
+        self._file = open(path, "ab+")
+        self._file.seek(0)
+        existing_header = self._file.read(FILE_HEADER.size)
+        if not existing_header:
+            self._file.write(header)
+        elif existing_header != header:
+            self._file.close()
+            raise ValueError("{} was recorded with a different board".format(
+                path))
+        self._actions = []
+        self._rewards = []
+
+    def reset(self, **kwargs):
+        self._write_episode()
+        return self.env.reset(**kwargs)
+
+    def step(self, action):
+        observation, reward, done, info = self.env.step(action)
+        self._actions.append(action)
+        self._rewards.append(reward)
+        if done:
+            self._write_episode()
+        return observation, reward, done, info
+
+    def close(self):
+        if not self._file.closed:
+            self._write_episode()
+            self._file.close()
+        return self.env.close()
+
+    def _write_episode(self):
+        if self._actions:
+            self._file.write(pack_episode(self.env.unwrapped.mines,
+                                          self._actions, self._rewards))
+            self._file.flush()
+            self._actions = []
+            self._rewards = []